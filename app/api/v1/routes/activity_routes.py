@@ -0,0 +1,29 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.db import get_read_db
+from app.services.activity_service import ActivityService
+from app.utils.jwt import get_current_user
+router = APIRouter()
+
+# ```````````````````````````board activity `````````````````````````````````````````````````
+@router.get("/board/{board_id}")
+async def get_board_activity(
+    board_id: int,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_current_user)
+):
+    return await ActivityService(db).get_board_activity(board_id, current_user, limit, cursor)
+
+# ```````````````````````````task activity `````````````````````````````````````````````````
+@router.get("/task/{task_id}")
+async def get_task_activity(
+    task_id: int,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_current_user)
+):
+    return await ActivityService(db).get_task_activity(task_id, current_user, limit, cursor)
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
 from app.schema.task_schema import BoardCreate,BoardUpdate
 from app.services.board_service import BoardService
 from app.utils.jwt import get_current_user
+from app.utils.etag import make_etag, etag_matches, set_etag, not_modified
 router = APIRouter()
 
 # ```````````````````````````create `````````````````````````````````````````````````
@@ -18,7 +19,7 @@ async def create_board(
 # ```````````````````````````get_all`````````````````````````````````````````````````
 @router.get("/all")
 async def get_all_boards(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
     service = BoardService(db)
@@ -27,7 +28,7 @@ async def get_all_boards(
 @router.get("/{board_id}")
 async def get_board_by_id(
     board_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
     service = BoardService(db)
@@ -57,8 +58,15 @@ async def delete_board(
 detail_router = APIRouter()
 @detail_router.get("/user")
 async def get_all_boards(
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
     service = BoardService(db)
+    versions = await service.get_board_versions(current_user)
+    etag = make_etag("detail", current_user.id, versions)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return await service.get_boards_with_details(current_user)
\ No newline at end of file
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Request, Response, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
 from app.schema.task_schema import ColumnCreate,ColumnUpdate
 from app.services.column_service import ColumnService
 from app.utils.jwt import get_current_user
+from app.utils.etag import make_etag, etag_matches, set_etag, not_modified
 router = APIRouter()
 
 # ```````````````````````````create `````````````````````````````````````````````````
@@ -19,17 +21,25 @@ async def create_column(
 @router.get("/board/{board_id}")
 async def get_columns(
     board_id: int,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
+    tasks_per_column: Optional[int] = Query(None, ge=0),
+    db: AsyncSession = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
     service = ColumnService(db)
-    return await service.get_columns(board_id, current_user)
+    version = await service.get_board_version(board_id, current_user)
+    etag = make_etag("columns", board_id, version, tasks_per_column)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return await service.get_columns(board_id, current_user, tasks_per_column)
 
 # ```````````````````````````get_by_id `````````````````````````````````````````````````
 @router.get("/{column_id}")
 async def get_column(
     column_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
     service = ColumnService(db)
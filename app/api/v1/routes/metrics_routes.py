@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends
+from app.core.db import db_instance
+from app.utils.board_cache import board_cache
+from app.utils.revocation import revoked_tokens
+from app.utils.identity_cache import identity_cache
+from app.utils.hashing import password_hasher
+from app.utils.audit import audit_writer
+from app.utils.jwt import get_current_user
+router = APIRouter()
+
+# ```````````````````````````runtime metrics `````````````````````````````````````````````````
+@router.get("/")
+async def get_metrics(current_user=Depends(get_current_user)):
+    return {
+        "success": True,
+        "message": "Metrics fetched successfully",
+        "data": {
+            "db_pool": db_instance.pool_stats(),
+            "board_cache": board_cache.stats(),
+            "revoked_tokens": revoked_tokens.stats(),
+            "identity_cache": identity_cache.stats(),
+            "password_hasher": password_hasher.stats(),
+            "audit": audit_writer.stats(),
+        },
+        "error": None
+    }
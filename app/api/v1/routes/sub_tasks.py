@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
 from app.schema.task_schema import SubTaskCreate,SubTaskUpdate
 from app.services.sub_task_service import SubTaskService
 from app.utils.jwt import get_current_user
@@ -17,7 +17,7 @@ async def create_subtask(
 @router.get("/{task_id}")
 async def get_subtasks(
     task_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
     return await SubTaskService(db).get_subtasks_by_task(task_id, current_user)
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Request, Response, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.db import get_db
-from app.schema.task_schema import TaskCreate,TaskUpdate,TaskMove
+from app.core.db import get_db, get_read_db
+from app.schema.task_schema import TaskCreate,TaskUpdate,TaskMove,TaskReorder
 from app.services.task_servie import TaskService
 from app.utils.jwt import get_current_user
+from app.utils.etag import make_etag, etag_matches, set_etag, not_modified
 router = APIRouter()
 
 # ```````````````````````````create `````````````````````````````````````````````````
@@ -18,16 +20,26 @@ async def create_task(
 @router.get("/column/{column_id}")
 async def get_tasks(
     column_id: int,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
-    return await TaskService(db).get_tasks(column_id, current_user)
+    service = TaskService(db)
+    version = await service.get_column_board_version(column_id, current_user)
+    etag = make_etag("tasks", column_id, version, limit, cursor)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return await service.get_tasks(column_id, current_user, limit, cursor)
 
 # ```````````````````````````get_by_id `````````````````````````````````````````````````
 @router.get("/{task_id}")
 async def get_task(
     task_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user=Depends(get_current_user)
 ):
     return await TaskService(db).get_task_by_id(task_id, current_user)
@@ -60,3 +72,11 @@ async def move_task(
 ):
     return await TaskService(db).move_task(payload, current_user)
 
+
+@move_router.put("/tasks")
+async def reorder_tasks(
+    payload: TaskReorder,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+    return await TaskService(db).reorder_tasks(payload, current_user)
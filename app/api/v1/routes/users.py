@@ -1,11 +1,12 @@
 from fastapi import (
-    APIRouter, Depends, UploadFile, File, Form, BackgroundTasks
+    APIRouter, Depends, UploadFile, File, Form, BackgroundTasks, Query
 )
+from fastapi.responses import StreamingResponse
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
-from app.core.db import get_db
-from app.services.user_service import UserService
+from app.core.db import get_db, get_read_db
+from app.services.user_service import UserService, stream_all_users
 from app.schema.users_schema import UserResponse
 from pydantic import  EmailStr
 from app.utils.jwt import get_current_user
@@ -39,15 +40,23 @@ async def create_user(
     )
 # ---------------- GET ALL USERS ----------------
 @router.get("/all")
-async def get_all_users(db: AsyncSession = Depends(get_db)):
+async def get_all_users(
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    db: AsyncSession = Depends(get_read_db)
+):
+    # ?stream=true: the whole list as NDJSON, without building it in memory
+    if stream:
+        return StreamingResponse(stream_all_users(), media_type="application/x-ndjson")
     service = UserService(db)
-    return await service.get_all_users()
+    return await service.get_all_users(limit, cursor)
 
 
 
 # ---------------- GET USER BY ID ----------------
 @router.get("/{user_id}")
-async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
+async def get_user(user_id: int, db: AsyncSession = Depends(get_read_db)):
     service = UserService(db)
     return await service.get_user_by_id(user_id)
    
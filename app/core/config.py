@@ -34,12 +34,29 @@ class Settings(BaseSettings):
     )
     # Alembic should always use SYNC_DATABASE_URL
 
+    # Connection pool (per worker process)
+    DB_POOL_SIZE: int = config("DB_POOL_SIZE", default=5, cast=int)
+    DB_MAX_OVERFLOW: int = config("DB_MAX_OVERFLOW", default=10, cast=int)
+    DB_POOL_TIMEOUT: int = config("DB_POOL_TIMEOUT", default=30, cast=int)
+    DB_POOL_RECYCLE: int = config("DB_POOL_RECYCLE", default=1800, cast=int)
+    DB_POOL_PRE_PING: bool = config("DB_POOL_PRE_PING", default=True, cast=bool)
+
+    # Optional read replica for GET endpoints; empty means everything goes to the primary
+    REPLICA_DATABASE_URL: str = config("REPLICA_DATABASE_URL", default="")
+    # After a write, the same client reads from the primary for this long;
+    # also the replica lag the revocation cache allows for
+    READ_YOUR_WRITES_SECONDS: int = config("READ_YOUR_WRITES_SECONDS", default=5, cast=int)
+
     # -------------------------
     # Security
     # -------------------------
     SECRET_KEY: str = config("SECRET_KEY", default=secrets.token_urlsafe(32))
     ACCESS_TOKEN_EXPIRE_MINUTES: int = config("ACCESS_TOKEN_EXPIRE_MINUTES", default=60 * 24, cast=int)
     ALGORITHM: str = config("ALGORITHM", default="HS256")
+    REFRESH_TOKEN_EXPIRE_DAYS: int = config("REFRESH_TOKEN_EXPIRE_DAYS", default=7, cast=int)
+    # bcrypt runs on a dedicated thread pool; requests beyond workers + queue get a 503
+    PASSWORD_HASH_WORKERS: int = config("PASSWORD_HASH_WORKERS", default=4, cast=int)
+    PASSWORD_HASH_MAX_QUEUE: int = config("PASSWORD_HASH_MAX_QUEUE", default=64, cast=int)
 
     # -------------------------
     # CORS Settings
@@ -64,6 +81,68 @@ class Settings(BaseSettings):
     MAIL_STARTTLS:bool= config("MAIL_STARTTLS", default=True, cast=bool)
     MAIL_SSL_TLS:bool= config("MAIL_SSL_TLS", default=False, cast=bool)
     USE_CREDENTIALS:bool= config("USE_CREDENTIALS", default=True, cast=bool)
+
+    # -------------------------
+    # Task ordering
+    # -------------------------
+    # Columns whose rank keys grow past this are respaced in the background
+    TASK_RANK_MAX_LENGTH: int = config("TASK_RANK_MAX_LENGTH", default=24, cast=int)
+
+    # -------------------------
+    # Subtask counters
+    # -------------------------
+    # How often Task.subtask_total/subtask_completed are checked against the
+    # subtasks table and repaired; 0 disables the background job
+    SUBTASK_REPAIR_INTERVAL_SECONDS: int = config("SUBTASK_REPAIR_INTERVAL_SECONDS", default=86400, cast=int)
+
+    # -------------------------
+    # Pagination
+    # -------------------------
+    # Page sizes used when the client sends no limit, and the caps on them
+    TASK_PAGE_SIZE: int = config("TASK_PAGE_SIZE", default=50, cast=int)
+    TASK_PAGE_SIZE_MAX: int = config("TASK_PAGE_SIZE_MAX", default=200, cast=int)
+    USER_PAGE_SIZE: int = config("USER_PAGE_SIZE", default=100, cast=int)
+    USER_PAGE_SIZE_MAX: int = config("USER_PAGE_SIZE_MAX", default=1000, cast=int)
+    ACTIVITY_PAGE_SIZE: int = config("ACTIVITY_PAGE_SIZE", default=50, cast=int)
+    ACTIVITY_PAGE_SIZE_MAX: int = config("ACTIVITY_PAGE_SIZE_MAX", default=200, cast=int)
+    # Rows fetched per round trip when streaming /user/all
+    USER_STREAM_BATCH_SIZE: int = config("USER_STREAM_BATCH_SIZE", default=1000, cast=int)
+
+    # -------------------------
+    # Caching
+    # -------------------------
+    BOARD_CACHE_MAX_ENTRIES: int = config("BOARD_CACHE_MAX_ENTRIES", default=1024, cast=int)
+    REVOKED_TOKEN_CACHE_MAX_ENTRIES: int = config("REVOKED_TOKEN_CACHE_MAX_ENTRIES", default=100_000, cast=int)
+    # How stale another worker's view of the revocation list may get
+    REVOKED_TOKEN_REFRESH_SECONDS: int = config("REVOKED_TOKEN_REFRESH_SECONDS", default=5, cast=int)
+    IDENTITY_CACHE_MAX_ENTRIES: int = config("IDENTITY_CACHE_MAX_ENTRIES", default=10_000, cast=int)
+    IDENTITY_CACHE_TTL_SECONDS: int = config("IDENTITY_CACHE_TTL_SECONDS", default=30, cast=int)
+
+    # -------------------------
+    # Audit log
+    # -------------------------
+    # "async": records are queued after commit and bulk-inserted in the background
+    #          (a crash or a full queue can lose records; writes never wait on them)
+    # "sync":  records are inserted in the writer's own transaction (never lost, slower)
+    AUDIT_MODE: str = config("AUDIT_MODE", default="async")
+    AUDIT_QUEUE_MAX_SIZE: int = config("AUDIT_QUEUE_MAX_SIZE", default=10_000, cast=int)
+    AUDIT_BATCH_SIZE: int = config("AUDIT_BATCH_SIZE", default=500, cast=int)
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = config("AUDIT_FLUSH_INTERVAL_SECONDS", default=1.0, cast=float)
+    # Comma-separated. Tables never audited, and "table.column" fields never captured
+    AUDIT_EXCLUDED_TABLES: str = config("AUDIT_EXCLUDED_TABLES", default="revoked_tokens,password_otp")
+    AUDIT_EXCLUDED_COLUMNS: str = config("AUDIT_EXCLUDED_COLUMNS", default="auth_user.password")
+    # Comma-separated "table.column:rate". An UPDATE that only touches sampled
+    # columns is recorded with that probability (e.g. reordering churn)
+    AUDIT_SAMPLED_COLUMNS: str = config("AUDIT_SAMPLED_COLUMNS", default="tasks.rank:0.1")
+    # Monthly partitions: months kept in full detail, then dropped whole
+    AUDIT_RETENTION_MONTHS: int = config("AUDIT_RETENTION_MONTHS", default=12, cast=int)
+    LOGIN_AUDIT_RETENTION_MONTHS: int = config("LOGIN_AUDIT_RETENTION_MONTHS", default=6, cast=int)
+    # Roll expiring audit_logs months into audit_log_summaries before dropping them
+    AUDIT_COMPACT_ON_RETENTION: bool = config("AUDIT_COMPACT_ON_RETENTION", default=True, cast=bool)
+    # 0 keeps summaries forever
+    AUDIT_SUMMARY_RETENTION_MONTHS: int = config("AUDIT_SUMMARY_RETENTION_MONTHS", default=0, cast=int)
+    AUDIT_PARTITIONS_AHEAD: int = config("AUDIT_PARTITIONS_AHEAD", default=3, cast=int)
+    AUDIT_MAINTENANCE_INTERVAL_SECONDS: int = config("AUDIT_MAINTENANCE_INTERVAL_SECONDS", default=21600, cast=int)
 # -------------------------
 # Railway settins
 # -------------------------
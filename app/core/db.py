@@ -2,18 +2,26 @@
 # app/core/database.py
 
 import json
+import time
 # from datetime import datetime
 from datetime import datetime, date
+from collections import deque
 
-from contextlib import asynccontextmanager
-from typing import Any, AsyncGenerator, Optional
+from contextlib import asynccontextmanager, contextmanager
+from functools import wraps
+from typing import Any, AsyncGenerator, Callable, Optional
 from sqlalchemy import (
     text, event, inspect, Column, Integer, String, DateTime, JSON
 )
+from sqlalchemy import exc
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker ,Session
+from fastapi import Request, Response, status
 from app.core.config import settings  # ensure settings.DATABASE_URL exists
+from app.core.response import AppException
 
 # ---------------------- #
 # BASE CONFIG
@@ -22,22 +30,96 @@ Base = declarative_base()
 DATABASE_URL = settings.DATABASE_URL
 
 
+# ---------------------- #
+# POOL METRICS
+# ---------------------- #
+class PoolMetrics:
+    """Checkout wait times and timeouts, recorded by InstrumentedPool."""
+
+    def __init__(self) -> None:
+        self._waits = deque(maxlen=1024)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.max_wait = 0.0
+
+    def record(self, waited: float) -> None:
+        self.checkouts += 1
+        self._waits.append(waited)
+        self.max_wait = max(self.max_wait, waited)
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+        p99 = waits[int(0.99 * (len(waits) - 1))] if waits else 0.0
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms": {
+                "avg": round(sum(waits) / len(waits) * 1000, 2) if waits else 0.0,
+                "p99": round(p99 * 1000, 2),
+                "max": round(self.max_wait * 1000, 2),
+            },
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        finally:
+            pool_metrics.record(time.perf_counter() - started)
+
+
 # ---------------------- #
 # DATABASE MANAGER
 # ---------------------- #
 class Database:
     def __init__(self) -> None:
-        self._engine = create_async_engine(
-            DATABASE_URL,
-            echo=False,  # Set to True for SQL query logging
-            future=True,
-        )
+        self._engine = self._create_engine(DATABASE_URL, poolclass=InstrumentedPool)
         self._session_factory = sessionmaker(
             bind=self._engine,
             class_=AsyncSession,
             expire_on_commit=False
         )
 
+        self._replica_engine = None
+        self._replica_session_factory = None
+        if settings.REPLICA_DATABASE_URL:
+            self._replica_engine = self._create_engine(
+                settings.REPLICA_DATABASE_URL, poolclass=AsyncAdaptedQueuePool
+            )
+            self._replica_session_factory = sessionmaker(
+                bind=self._replica_engine,
+                class_=AsyncSession,
+                expire_on_commit=False
+            )
+
+    @staticmethod
+    def _create_engine(url: str, poolclass):
+        return create_async_engine(
+            url,
+            echo=False,  # Set to True for SQL query logging
+            future=True,
+            poolclass=poolclass,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+
+    @property
+    def has_replica(self) -> bool:
+        return self._replica_session_factory is not None
+
     @asynccontextmanager
     async def db_connection(self) -> AsyncGenerator[AsyncSession, None]:
         async with self._session_factory() as session:
@@ -51,11 +133,167 @@ class Database:
             finally:
                 await session.close()
 
+    @asynccontextmanager
+    async def replica_connection(self) -> AsyncGenerator[AsyncSession, None]:
+        """Read-only session on the replica; nothing is ever committed."""
+        async with self._replica_session_factory() as session:
+            try:
+                yield session
+            finally:
+                await session.rollback()
+                await session.close()
+
+    @staticmethod
+    def _pool_usage(pool) -> dict:
+        # QueuePool.overflow() counts down from -pool_size while the pool is
+        # still filling; only a positive value is overflow actually in use
+        overflow = max(0, pool.overflow())
+        capacity = pool.size() + settings.DB_MAX_OVERFLOW
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": overflow,
+            "saturation": round(pool.checkedout() / capacity, 2) if capacity else 0.0,
+        }
+
+    def pool_stats(self) -> dict:
+        stats = {**self._pool_usage(self._engine.pool), **pool_metrics.stats()}
+        if self._replica_engine is not None:
+            stats["replica"] = self._pool_usage(self._replica_engine.pool)
+        return stats
+
 
 db_instance = Database()
 
 
+# ---------------------- #
+# READ-YOUR-WRITES TRACKING
+# ---------------------- #
+# The time of a client's last write travels with the client (cookie, or the
+# header for non-browser clients), so every worker routes its next reads the
+# same way. Within READ_YOUR_WRITES_SECONDS of it, reads stay on the primary.
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "X-Last-Write"
+
+
+def mark_last_write(response: Response) -> None:
+    written_at = str(int(time.time()))
+    response.headers[LAST_WRITE_HEADER] = written_at
+    response.set_cookie(
+        LAST_WRITE_COOKIE,
+        written_at,
+        max_age=settings.READ_YOUR_WRITES_SECONDS,
+        httponly=True,
+        samesite="lax",
+    )
+
+
+def wrote_recently(request: Request) -> bool:
+    value = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    try:
+        written_at = int(value)
+    except (TypeError, ValueError):
+        return False
+    # Stamps from the future (beyond one window of clock skew) are ignored
+    age = time.time() - written_at
+    return -settings.READ_YOUR_WRITES_SECONDS <= age < settings.READ_YOUR_WRITES_SECONDS
+
+
+# ---------------------- #
+# UNIT OF WORK
+# ---------------------- #
+@asynccontextmanager
+async def unit_of_work(session: AsyncSession) -> AsyncGenerator[AsyncSession, None]:
+    """
+    One transaction per outermost service call.
+    The outermost unit commits once on success and rolls back on error; nested
+    units run inside a SAVEPOINT so a failing inner call only undoes its own work.
+    """
+    depth = session.info.get("uow_depth", 0)
+    session.info["uow_depth"] = depth + 1
+    try:
+        if depth:
+            async with session.begin_nested():
+                yield session
+        else:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                session.info.pop("on_commit", None)
+                raise
+            for callback in session.info.pop("on_commit", []):
+                callback()
+    finally:
+        session.info["uow_depth"] = depth
+
+
+def transactional(method):
+    """Run a service method (with `self.db`) inside a unit of work."""
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        async with unit_of_work(self.db):
+            return await method(self, *args, **kwargs)
+    return wrapper
+
+
+def on_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """Run `callback` once the current unit of work has committed (e.g. cache invalidation)."""
+    session.info.setdefault("on_commit", []).append(callback)
+
+
+@contextmanager
+def unique_conflicts(conflicts: dict[str, str]):
+    """
+    Turn a violation of one of the named unique constraints into a 409.
+    `conflicts` maps constraint name -> message; other integrity errors propagate.
+    The unit of work rolls the transaction back when the exception leaves it.
+    """
+    try:
+        yield
+    except IntegrityError as e:
+        for constraint, message in conflicts.items():
+            if constraint in str(e.orig):
+                raise AppException(
+                    message=message,
+                    status_code=status.HTTP_409_CONFLICT
+                )
+        raise
+
+
+async def flush_unique(session: AsyncSession, conflicts: dict[str, str]) -> None:
+    """Flush under unique_conflicts(); for statements run directly, use that instead."""
+    with unique_conflicts(conflicts):
+        await session.flush()
+
+
+async def release_connection(session: AsyncSession) -> None:
+    """
+    Hand the session's pooled connection back before slow non-database work
+    (password hashing, uploads). Call it only before the unit of work writes
+    anything: it ends the read-only transaction so far. Loaded objects stay
+    usable and the next statement checks out a connection again. Inside a
+    nested unit of work the enclosing transaction owns the connection, so
+    this is a no-op there.
+    """
+    if session.info.get("uow_depth", 0) > 1 or not session.in_transaction():
+        return
+    await session.commit()
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with db_instance.db_connection() as session:
         yield session
 
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only endpoints: the replica when configured, unless the client just wrote."""
+    if db_instance.has_replica and not wrote_recently(request):
+        async with db_instance.replica_connection() as session:
+            yield session
+    else:
+        async with db_instance.db_connection() as session:
+            yield session
+
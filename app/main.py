@@ -6,12 +6,33 @@ from app.core.exception_handler import app_exception_handler,validation_exceptio
 from app.utils.jwt import jwt_middleware ,PUBLIC_URLS
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers.v1_master_routes import master_routers
+from app.utils.audit import audit_writer
+from app.utils.audit_maintenance import start_audit_maintenance, stop_audit_maintenance
+from app.services.sub_task_service import start_subtask_repair, stop_subtask_repair
 # ----------------------------
 # Initialize FastAPI app
 # ----------------------------
 app = FastAPI(title="Project Management", version="1.0.0")
 
 
+# ----------------------------
+# Background workers
+# ----------------------------
+@app.on_event("startup")
+async def start_audit_writer():
+    audit_writer.start()
+    start_audit_maintenance()
+    start_subtask_repair()
+
+
+@app.on_event("shutdown")
+async def stop_audit_writer():
+    await stop_audit_maintenance()
+    await stop_subtask_repair()
+    # Flush queued audit records before the process exits
+    await audit_writer.stop()
+
+
 
 app.add_middleware(
     CORSMiddleware,
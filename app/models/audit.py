@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime , ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime , ForeignKey, JSON, Date, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.db import Base
@@ -8,28 +9,64 @@ from app.core.db import Base
 
 class LoginAuditLog(Base):
     __tablename__ = "login_audit_logs"
+    # Monthly RANGE partitions on timestamp (app/utils/audit_maintenance.py);
+    # the partition key has to be part of the primary key
+    __table_args__ = (
+        Index("ix_login_audit_logs_user_time", "user_id", "timestamp"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     user_id = Column(Integer, nullable=True)  # nullable for failed login if user not found
     action = Column(String(50), nullable=False)  # login/logout/admin_login
     status = Column(String(20), nullable=False)  # "success" or "failure"
     ip_address = Column(String(45))
     user_agent = Column(String(255))
     message = Column(String(255), nullable=True)  # optional extra info
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, primary_key=True, default=datetime.utcnow)
 
 
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # History of one record, and the per-board / per-task activity feeds
+        Index("ix_audit_logs_record", "table_name", "record_id", "timestamp"),
+        Index("ix_audit_logs_board_feed", "board_id", "timestamp", "id"),
+        Index("ix_audit_logs_task_feed", "task_id", "timestamp", "id"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     table_name = Column(String, nullable=False)
     record_id = Column(Integer, nullable=True)
     action = Column(String, nullable=False)  # INSERT, UPDATE, DELETE
-    changed_data = Column(JSON, nullable=True)
+    # Native JSON object (jsonb on PostgreSQL), see encode_value in app/utils/audit.py
+    changed_data = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
     user_id = Column(Integer, ForeignKey("auth_user.id",ondelete="SET NULL"),nullable=True)
     ip_address = Column(String, nullable=True)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, primary_key=True, default=datetime.utcnow)
+    # Activity scope, filled when the change is captured (no FKs: rows outlive boards)
+    board_id = Column(Integer, nullable=True)
+    task_id = Column(Integer, nullable=True)
 
     user = relationship("AuthUser", backref="audit_logs")
+
+
+class AuditLogSummary(Base):
+    """Per-record monthly roll-up of audit_logs rows, written when a month is compacted."""
+    __tablename__ = "audit_log_summaries"
+    __table_args__ = (
+        UniqueConstraint("table_name", "record_id", "month", name="uq_audit_log_summaries_record_month"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    table_name = Column(String, nullable=False)
+    record_id = Column(Integer, nullable=True)
+    month = Column(Date, nullable=False)
+    creates = Column(Integer, nullable=False, default=0)
+    updates = Column(Integer, nullable=False, default=0)
+    deletes = Column(Integer, nullable=False, default=0)
+    first_at = Column(DateTime, nullable=False)
+    last_at = Column(DateTime, nullable=False)
+    last_user_id = Column(Integer, nullable=True)
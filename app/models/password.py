@@ -1,10 +1,13 @@
 from datetime import datetime, timedelta
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index
 from app.core.db import Base
 
 
 class PasswordOTP(Base):
     __tablename__ = "password_otp"
+    __table_args__ = (
+        Index("ix_password_otp_email_type", "email", "type"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, nullable=False)
@@ -1,17 +1,33 @@
 # models/board.py
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Text, Computed, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from app.core.db import Base
 
 
+def normalized(column_name: str) -> Computed:
+    """Stored normalize_name() of a column: lowercased, whitespace, '-' and '_' removed."""
+    return Computed(
+        f"regexp_replace(lower({column_name}), '[[:space:]_-]+', '', 'g')",
+        persisted=True
+    )
+
+
 class Board(Base):
     __tablename__ = "boards"
+    __table_args__ = (
+        UniqueConstraint("user_id", "name_normalized", name="uq_boards_user_name"),
+    )
+    # Fetch the computed column with RETURNING so flushed objects stay loaded
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("auth_user.id"))
     name = Column(String(255), nullable=False)
+    name_normalized = Column(String(255), normalized("name"))
     is_active = Column(Boolean, default=True)
-    
+    # Bumped on every write to the board, its columns, tasks or subtasks
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+
     user = relationship(
         "AuthUser",
         back_populates="boards"
@@ -25,9 +41,14 @@ class Board(Base):
 
 class BoardColumn(Base):
     __tablename__ = "board_columns"
+    __table_args__ = (
+        UniqueConstraint("board_id", "name_normalized", name="uq_board_columns_board_name"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False)
+    name_normalized = Column(String(100), normalized("name"))
     board_id = Column(Integer, ForeignKey("boards.id"))
 
     board = relationship("Board", back_populates="columns")
@@ -40,12 +61,26 @@ class BoardColumn(Base):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        UniqueConstraint("column_id", "title_normalized", name="uq_tasks_column_title"),
+        # Column listings, neighbour lookups and position counts walk (rank, id)
+        Index("ix_tasks_column_rank", "column_id", "rank", "id"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True)
     title = Column(String(255), nullable=False)
+    title_normalized = Column(String(255), normalized("title"))
     description = Column(Text, nullable=True)
     column_id = Column(Integer, ForeignKey("board_columns.id"))
-    position = Column(Integer, nullable=False)
+    # Lexicographic order key within the column (app/utils/lexorank.py);
+    # API "position" values are the 1-based ordinal derived from it.
+    # Collation "C" compares bytes, the order the keys are generated in;
+    # locale collations ignore case on the first pass and would reorder them.
+    rank = Column(String(255, collation="C"), nullable=False)
+    # Denormalized subtask progress, kept in step by the task and subtask services
+    subtask_total = Column(Integer, nullable=False, default=0, server_default="0")
+    subtask_completed = Column(Integer, nullable=False, default=0, server_default="0")
 
     column = relationship("BoardColumn", back_populates="tasks")
     subtasks = relationship(
@@ -56,9 +91,14 @@ class Task(Base):
 
 class SubTask(Base):
     __tablename__ = "subtasks"
+    __table_args__ = (
+        UniqueConstraint("task_id", "title_normalized", name="uq_subtasks_task_title"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True)
     title = Column(String(255), nullable=False)
+    title_normalized = Column(String(255), normalized("title"))
     is_completed = Column(Boolean, default=False)
 
     task_id = Column(Integer, ForeignKey("tasks.id"))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Boolean, DateTime, Text, Date
+from sqlalchemy import Column, ForeignKey, Integer, String, Boolean, DateTime, Text, Date, Index
 from app.core.db import Base
 from datetime import datetime
 from sqlalchemy.dialects.postgresql import JSON
@@ -15,10 +15,12 @@ class AuthUser(Base):
     dob = Column(Date, nullable=True)
     age = Column(Integer, index=True, nullable=True)
     gender = Column(String,nullable=True)
-    email = Column(String, nullable=False)
+    email = Column(String, nullable=False, index=True)
     phone_number = Column(String,  nullable=True)
     password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
+    # Carried in every JWT as "ver"; bumping it revokes all tokens issued before
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     profile_image = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -30,5 +32,9 @@ class AuthUser(Base):
 
 class RevokedToken(Base):
     __tablename__ = "revoked_tokens"
+    __table_args__ = (
+        # Incremental refresh of the revocation cache reads (jti, revoked_at) by time
+        Index("ix_revoked_tokens_revoked_at", "revoked_at", postgresql_include=["jti"]),
+    )
     jti = Column(String, primary_key=True, index=True)
     revoked_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
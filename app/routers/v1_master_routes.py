@@ -6,7 +6,9 @@ from app.api.v1.routes import (
                                 board_routes,
                                 column_routes,
                                 tasks_routes,
-                                sub_tasks
+                                sub_tasks,
+                                metrics_routes,
+                                activity_routes
                     
 
 )
@@ -59,4 +61,14 @@ master_routers.include_router(
     sub_tasks.router,
     prefix="/subtask",  
     tags=["subtask"],  
+)
+master_routers.include_router(
+    metrics_routes.router,
+    prefix="/metrics",  
+    tags=["Metrics"],  
+)
+master_routers.include_router(
+    activity_routes.router,
+    prefix="/activity",  
+    tags=["Activity"],  
 )
\ No newline at end of file
@@ -68,6 +68,19 @@ class TaskMove(BaseModel):
     destination_position: int
 
 
+class TaskPlacement(BaseModel):
+    task_id: int
+    column_id: int
+    # Neighbours in the destination column once the task is in place: the task
+    # directly above it (before_id) and/or directly below it (after_id).
+    # Neither means the end of the column.
+    before_id: Optional[int] = None
+    after_id: Optional[int] = None
+
+class TaskReorder(BaseModel):
+    moves: List[TaskPlacement]
+
+
 
 
 
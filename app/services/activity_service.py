@@ -0,0 +1,114 @@
+from datetime import datetime
+from fastapi import status
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.audit import AuditLog
+from app.models.tasks import Board, BoardColumn, Task
+from app.core.config import settings
+from app.core.response import AppException
+from app.utils.pagination import encode_cursor, decode_cursor, page_size
+
+
+class ActivityService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # -------------------------------------------------------
+    # Activity feeds (newest first, keyset-paginated)
+    # -------------------------------------------------------
+    async def get_board_activity(self, board_id: int, current_user, limit: int = None, cursor: str = None):
+        owned = await self.db.scalar(
+            select(Board.id).where(
+                Board.id == board_id,
+                Board.user_id == current_user.id
+            )
+        )
+        if not owned:
+            raise AppException(
+                message="Board not found",
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+
+        return await self._feed(AuditLog.board_id == board_id, limit, cursor)
+
+    async def get_task_activity(self, task_id: int, current_user, limit: int = None, cursor: str = None):
+        owned = await self.db.scalar(
+            select(Task.id)
+            .join(BoardColumn, Task.column_id == BoardColumn.id)
+            .where(
+                Task.id == task_id,
+                BoardColumn.board.has(user_id=current_user.id)
+            )
+        )
+        if not owned:
+            raise AppException(
+                message="Task not found",
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+
+        return await self._feed(AuditLog.task_id == task_id, limit, cursor)
+
+    async def _feed(self, scope, limit, cursor):
+        """
+        One page of audit rows in (timestamp, id) descending order. Reads a single
+        range of the board/task feed index, so the cost depends on the page size,
+        not on how many audit rows exist.
+        """
+        limit = page_size(limit, settings.ACTIVITY_PAGE_SIZE, settings.ACTIVITY_PAGE_SIZE_MAX)
+        after = decode_cursor(cursor, timestamp=str, id=int)
+
+        query = (
+            select(
+                AuditLog.id,
+                AuditLog.table_name,
+                AuditLog.record_id,
+                AuditLog.action,
+                AuditLog.changed_data,
+                AuditLog.user_id,
+                AuditLog.timestamp
+            )
+            .where(scope)
+            .order_by(AuditLog.timestamp.desc(), AuditLog.id.desc())
+            .limit(limit + 1)
+        )
+        if after:
+            try:
+                after_timestamp = datetime.fromisoformat(after["timestamp"])
+            except (TypeError, ValueError):
+                raise AppException(
+                    message="Invalid pagination cursor",
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+            query = query.where(
+                tuple_(AuditLog.timestamp, AuditLog.id) < tuple_(after_timestamp, after["id"])
+            )
+        rows = (await self.db.execute(query)).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = encode_cursor(timestamp=last.timestamp.isoformat(), id=last.id)
+
+        return {
+            "success": True,
+            "message": "Activity fetched successfully",
+            "data": {
+                "activity": [
+                    {
+                        "id": row.id,
+                        "table_name": row.table_name,
+                        "record_id": row.record_id,
+                        "action": row.action,
+                        "changes": row.changed_data,
+                        "user_id": row.user_id,
+                        "timestamp": row.timestamp
+                    }
+                    for row in rows
+                ],
+                "next_cursor": next_cursor,
+                "has_more": has_more
+            },
+            "error": None
+        }
@@ -1,12 +1,13 @@
 from fastapi import Request, status
 from sqlalchemy.future import select
-from passlib.context import CryptContext
 from app.models.users import AuthUser,RevokedToken
 from app.core.response import AppException
-from app.utils.jwt import create_jwt, decode_jwt
+from app.utils.jwt import create_jwt, decode_jwt, load_token_principal, AuthError
 from sqlalchemy.exc import IntegrityError
 from app.schema.login_schema import RefreshTokenRequest
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.utils.revocation import revoked_tokens
+from app.utils.hashing import password_hasher
+from app.core.db import transactional, on_commit, release_connection
 
 class AuthService:
     def __init__(self, db):
@@ -30,7 +31,9 @@ class AuthService:
         # --------------------------
         #  Verify password
         # --------------------------
-        if not pwd_context.verify(password, user.password):
+        # Don't hold a pooled connection for the ~100ms bcrypt takes
+        await release_connection(self.db)
+        if not await password_hasher.verify(password, user.password):
             raise AppException(
                 message="Invalid password",
                 error="Unauthorized",
@@ -53,6 +56,7 @@ class AuthService:
         claims = {
             "sub": str(user.id),
             "email": user.email,
+            "ver": user.token_version,
         }
 
         access_token, _ = create_jwt(claims)
@@ -73,6 +77,7 @@ class AuthService:
             },
             "error": None,
         }
+    @transactional
     async def logout(self, request: Request):
     
             auth_header = request.headers.get("Authorization")
@@ -107,14 +112,14 @@ class AuthService:
             revoked_token = RevokedToken(jti=jti)
             self.db.add(revoked_token)
             try:
-                await self.db.commit()
+                await self.db.flush()
             except IntegrityError:
-                await self.db.rollback()
                 raise AppException(
                     message="Token is already revoked",
                     error="Token blocklisted",
                     status_code=status.HTTP_400_BAD_REQUEST
                 )
+            on_commit(self.db, lambda: revoked_tokens.add(jti, revoked_token.revoked_at))
             return {
                 "success": True,
                 "message": "Token revoked successfully",
@@ -142,20 +147,28 @@ class AuthService:
 
         jti = token_data.get("jti")
         # Check if token is revoked
-        result = await self.db.execute(
-            select(RevokedToken).where(RevokedToken.jti == jti)
-        )
-        if result.scalars().first():
+        if await revoked_tokens.is_revoked(self.db, jti, token_data.get("iat")):
             raise AppException(
                 message="Refresh token is revoked",
                 error="Unauthorized",
                 status_code=status.HTTP_401_UNAUTHORIZED,
             )
 
+        # Refresh tokens issued before the last password reset are revoked too
+        try:
+            await load_token_principal(self.db, token_data)
+        except AuthError as e:
+            raise AppException(
+                message=e.message,
+                error="Unauthorized",
+                status_code=status.HTTP_401_UNAUTHORIZED,
+            )
+
         # Generate new access token
         claims = {
             "sub": token_data.get("sub"),
             "email": token_data.get("email"),
+            "ver": token_data.get("ver", 0),
         }
         access_token, _ = create_jwt(claims)
 
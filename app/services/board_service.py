@@ -3,10 +3,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.tasks import Board,BoardColumn,Task,SubTask
 from app.core.response import AppException
 from sqlalchemy.future import select
-from sqlalchemy import select, func
+from sqlalchemy import select, any_, bindparam, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
 import re
 from app.schema.task_schema import BoardCreate
 from sqlalchemy.orm import selectinload
+from app.utils.board_cache import board_cache, bump_board_version
+from app.core.db import transactional, on_commit, flush_unique
 
 def normalize_name(name: str) -> str:
     return re.sub(r'[\s\-_]+', '', name).lower()
@@ -14,30 +17,19 @@ class BoardService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    @transactional
     async def create_board(self, payload: BoardCreate, current_user):
         try:
-            #  Check duplicate board for user
-            existing = await self.db.scalar(
-                select(Board).where(
-                    Board.user_id == current_user.id,
-                    func.lower(Board.name) == payload.name.lower()
-                )
-            )
-
-            if existing:
-                raise AppException(
-                    message="Board with this name already exists",
-                    status_code=status.HTTP_409_CONFLICT
-                )
-
-            #  Create board
+            #  Create board; duplicate names are rejected by uq_boards_user_name
             board = Board(
                 name=payload.name.strip(),
                 user_id=current_user.id,
                 is_active=payload.isActive
             )
             self.db.add(board)
-            await self.db.flush() 
+            await flush_unique(self.db, {
+                "uq_boards_user_name": "Board with this name already exists"
+            })
 
             created_columns = []
 
@@ -67,10 +59,11 @@ class BoardService:
                     created_columns.append(column)
 
             # -------------------------
-            # Commit
+            # Flush (INSERT ... RETURNING ids); committed by the unit of work
             # -------------------------
-            await self.db.commit()
-            await self.db.refresh(board)
+            await flush_unique(self.db, {
+                "uq_board_columns_board_name": "Duplicate column names in request"
+            })
 
             return {
                 "success": True,
@@ -91,11 +84,9 @@ class BoardService:
             }
 
         except AppException:
-            await self.db.rollback()
             raise
 
         except Exception as e:
-            await self.db.rollback()
             raise AppException(
                 message="Unexpected error occurred",
                 error=str(e),
@@ -145,6 +136,7 @@ class BoardService:
 
 
 
+    @transactional
     async def update_board(self, board_id: int, payload, current_user):
 
         board = await self.db.scalar(
@@ -163,30 +155,25 @@ class BoardService:
             )
 
         if payload.name is not None:
-            dup = await self.db.scalar(
-                select(Board).where(
-                    Board.user_id == current_user.id,
-                    func.lower(Board.name) == payload.name.lower(),
-                    Board.id != board_id
-                )
-            )
-
-            if dup:
-                raise AppException(
-                    message="Board with this name already exists",
-                    status_code=status.HTTP_409_CONFLICT
-                )
-
             board.name = payload.name.strip()
+            await flush_unique(self.db, {
+                "uq_boards_user_name": "Board with this name already exists"
+            })
 
         if payload.isActive is not None:
             board.is_active = payload.isActive
 
         if payload.columns is not None:
             existing_columns = {col.id: col for col in board.columns}
-            incoming_ids = set()
+            incoming_ids = {col.id for col in payload.columns if col.id}
             seen = set()
 
+            # Drop removed columns first so their names are free for renames
+            for col_id, column in existing_columns.items():
+                if col_id not in incoming_ids:
+                    await self.db.delete(column)
+            await self.db.flush()
+
             for col in payload.columns:
                 normalized = normalize_name(col.name)
 
@@ -205,7 +192,6 @@ class BoardService:
                             status_code=status.HTTP_404_NOT_FOUND
                         )
                     column.name = col.name.strip()
-                    incoming_ids.add(col.id)
                 else:
                     self.db.add(
                         BoardColumn(
@@ -214,11 +200,11 @@ class BoardService:
                         )
                     )
 
-            for col_id, column in existing_columns.items():
-                if col_id not in incoming_ids:
-                    await self.db.delete(column)
+            await flush_unique(self.db, {
+                "uq_board_columns_board_name": "Column with this name already exists in this board"
+            })
 
-        await self.db.commit()
+        await bump_board_version(self.db, board_id=board.id)
 
         return {
             "success": True,
@@ -235,6 +221,7 @@ class BoardService:
             "error": None
         }
 
+    @transactional
     async def delete_board(self, board_id: int, current_user):
         result = await self.db.execute(
             select(Board).where(
@@ -251,7 +238,7 @@ class BoardService:
             )
 
         await self.db.delete(board)
-        await self.db.commit()
+        on_commit(self.db, lambda: board_cache.evict_board(board_id))
 
         return {
             "success": True,
@@ -259,72 +246,123 @@ class BoardService:
             "data": None,
             "error": None
         }
+    async def get_board_versions(self, current_user) -> list[tuple[int, int]]:
+        """(id, version) of every board the user owns; changes whenever the detail view would."""
+        result = await self.db.execute(
+            select(Board.id, Board.version)
+            .where(Board.user_id == current_user.id)
+            .order_by(Board.id)
+        )
+        return [tuple(row) for row in result.all()]
+
     async def get_boards_with_details(self, current_user):
         # Fetch all boards for this user
         result = await self.db.execute(
             select(Board)
             .where(Board.user_id == current_user.id)
+            .order_by(Board.id)
         )
         boards = result.scalars().all()
-        data = []
 
+        # Serve unchanged boards from the snapshot cache, load the rest in one pass
+        trees = {}
         for board in boards:
-            board_dict = {
+            cached = board_cache.get("detail", board.id, board.version)
+            if cached is not None:
+                trees[board.id] = cached
+
+        missing = [board for board in boards if board.id not in trees]
+        loaded = await self._load_board_trees([board.id for board in missing])
+        for board in missing:
+            board_cache.put("detail", board.id, board.version, loaded[board.id])
+            trees[board.id] = loaded[board.id]
+
+        data = [
+            {
                 "name": board.name,
                 "isActive": board.is_active,
-                "columns": []
+                "columns": trees[board.id]
             }
-
-            # Fetch columns for this board
-            columns_result = await self.db.execute(
-                select(BoardColumn)
-                .where(BoardColumn.board_id == board.id)
-            )
-            columns = columns_result.scalars().all()
-
-            for column in columns:
-                column_dict = {
-                    "name": column.name,
-                    "tasks": []
-                }
-
-                # Fetch tasks in this column
-                tasks_result = await self.db.execute(
-                    select(Task)
-                    .where(Task.column_id == column.id)
-                    .order_by(Task.position)
-                )
-                tasks = tasks_result.scalars().all()
-
-                for task in tasks:
-                    # Fetch subtasks for this task
-                    subtasks_result = await self.db.execute(
-                        select(SubTask)
-                        .where(SubTask.task_id == task.id)
-                    )
-                    subtasks = subtasks_result.scalars().all()
-
-                    task_dict = {
-                        "title": task.title,
-                        "description": task.description or "",
-                        "status": column.name,
-                        "subtasks": [
-                            {
-                                "title": s.title,
-                                "isCompleted": s.is_completed
-                            } for s in subtasks
-                        ]
-                    }
-
-                    column_dict["tasks"].append(task_dict)
-
-                board_dict["columns"].append(column_dict)
-
-            data.append(board_dict)
+            for board in boards
+        ]
 
         return {
             "success": True,
             "message": "Boards fetched successfully",
             "data": data,
             "error": None
-        }
\ No newline at end of file
+        }
+
+    async def _load_board_trees(self, board_ids: list[int]) -> dict[int, list]:
+        """
+        Load the columns -> tasks -> subtasks tree for the given boards.
+        Runs one set-based query per level (at most three in total, however
+        large the boards are) and assembles the nested payload in memory.
+        Every level filters on the board ids, sent as a single array parameter
+        (= ANY), so the statements stay the same size as the boards grow.
+        """
+        trees = {board_id: [] for board_id in board_ids}
+        if not board_ids:
+            return trees
+        in_boards = BoardColumn.board_id == any_(
+            bindparam("board_ids", board_ids, type_=ARRAY(Integer))
+        )
+
+        # Columns of every board
+        columns_result = await self.db.execute(
+            select(BoardColumn.id, BoardColumn.board_id, BoardColumn.name)
+            .where(in_boards)
+            .order_by(BoardColumn.id)
+        )
+        columns = {}
+        for column_id, board_id, name in columns_result.all():
+            column_dict = {
+                "name": name,
+                "tasks": []
+            }
+            columns[column_id] = column_dict
+            trees[board_id].append(column_dict)
+
+        if not columns:
+            return trees
+
+        # Tasks of every column
+        tasks_result = await self.db.execute(
+            select(Task.id, Task.column_id, Task.title, Task.description, Task.subtask_total)
+            .join(BoardColumn, Task.column_id == BoardColumn.id)
+            .where(in_boards)
+            .order_by(Task.column_id, Task.rank, Task.id)
+        )
+        tasks = {}
+        with_subtasks = False
+        for task_id, column_id, title, description, subtask_total in tasks_result.all():
+            column_dict = columns[column_id]
+            task_dict = {
+                "title": title,
+                "description": description or "",
+                "status": column_dict["name"],
+                "subtasks": []
+            }
+            tasks[task_id] = task_dict
+            column_dict["tasks"].append(task_dict)
+            if subtask_total:
+                with_subtasks = True
+
+        if not with_subtasks:
+            return trees
+
+        # Subtasks, only for tasks whose counter says they have any
+        subtasks_result = await self.db.execute(
+            select(SubTask.task_id, SubTask.title, SubTask.is_completed)
+            .join(Task, SubTask.task_id == Task.id)
+            .join(BoardColumn, Task.column_id == BoardColumn.id)
+            .where(in_boards, Task.subtask_total > 0)
+            .order_by(SubTask.id)
+        )
+        for task_id, title, is_completed in subtasks_result.all():
+            tasks[task_id]["subtasks"].append({
+                "title": title,
+                "isCompleted": is_completed
+            })
+
+        return trees
@@ -3,11 +3,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.tasks import BoardColumn,Board
 from app.core.response import AppException
 from sqlalchemy.future import select
-from sqlalchemy import select, func
+from sqlalchemy import select, func, true
 import re
-from sqlalchemy.orm import selectinload
 
 from app.models import Task
+from app.utils.board_cache import board_cache, bump_board_version
+from app.core.db import transactional, flush_unique
+from app.utils.pagination import encode_cursor
 
 def normalize_name(name: str) -> str:
     return re.sub(r'[\s\-_]+', '', name).lower()
@@ -16,6 +18,7 @@ class ColumnService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    @transactional
     async def create_column(self, payload, current_user):
         try:
             
@@ -26,38 +29,23 @@ class ColumnService:
                 )
             )
             board = board_result.scalar_one_or_none()
-            normalized = normalize_name(payload.name)
             if not board:
                 raise AppException(
                     message="Board not found",
                     status_code=status.HTTP_404_NOT_FOUND
                 )
 
-            
-            dup_result = await self.db.execute(
-                        select(BoardColumn).where(
-                            BoardColumn.board_id == payload.board_id,
-                            func.replace(
-                                func.replace(
-                                    func.replace(func.lower(BoardColumn.name), ' ', ''),
-                                    '-', ''
-                                ),
-                                '_', ''
-                            ) == normalized))
-            if dup_result.scalar_one_or_none():
-                raise AppException(
-                    message="Column with this name already exists in this board",
-                    status_code=status.HTTP_409_CONFLICT
-                )
-
+            # Duplicate names are rejected by uq_board_columns_board_name
             column = BoardColumn(
                 name=payload.name.strip(),
                 board_id=payload.board_id
             )
 
             self.db.add(column)
-            await self.db.commit()
-            await self.db.refresh(column)
+            await flush_unique(self.db, {
+                "uq_board_columns_board_name": "Column with this name already exists in this board"
+            })
+            await bump_board_version(self.db, board_id=payload.board_id)
 
             return {
                 "success": True,
@@ -67,11 +55,9 @@ class ColumnService:
             }
 
         except AppException as e:
-            await self.db.rollback()
             raise e
 
         except Exception as e:
-            await self.db.rollback()
             raise AppException(
                 message="Unexpected error occurred",
                 error=str(e),
@@ -79,7 +65,28 @@ class ColumnService:
             )
         
 
-    async def get_columns(self, board_id: int, current_user):
+    async def get_board_version(self, board_id: int, current_user) -> int:
+        version = await self.db.scalar(
+            select(Board.version).where(
+                Board.id == board_id,
+                Board.user_id == current_user.id
+            )
+        )
+
+        if version is None:
+            raise AppException(
+                message="Board not found",
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+
+        return version
+
+    async def get_columns(self, board_id: int, current_user, tasks_per_column: int = None):
+        """
+        Columns of a board with their tasks in board order. With `tasks_per_column`
+        only the first N tasks of each column are returned, together with the
+        column's task_count and a cursor for /tasks/column/{id} to load the rest.
+        """
         board = await self.db.scalar(
             select(Board).where(
                 Board.id == board_id,
@@ -93,42 +100,102 @@ class ColumnService:
                 status_code=status.HTTP_404_NOT_FOUND
             )
 
+        view = "columns" if tasks_per_column is None else f"columns:{tasks_per_column}"
+        cached = board_cache.get(view, board.id, board.version)
+        if cached is not None:
+            return {
+                "success": True,
+                "message": "Columns fetched successfully",
+                "data": cached,
+                "error": None
+            }
+
         result = await self.db.execute(
-            select(BoardColumn)
+            select(BoardColumn.id, BoardColumn.name)
             .where(BoardColumn.board_id == board_id)
-            .options(
-                selectinload(BoardColumn.tasks)
-                .selectinload(Task.subtasks)
-            )
+            .order_by(BoardColumn.id)
         )
-
         columns = []
-
-        for column in result.scalars().all():
+        by_id = {}
+        for column_id, name in result.all():
             column_data = {
-                "id": column.id,
-                "name": column.name,
+                "id": column_id,
+                "name": name,
+                "task_count": 0,
+                "next_cursor": None,
                 "tasks": []
             }
+            columns.append(column_data)
+            by_id[column_id] = column_data
+
+        # Subtask progress comes from the counters on Task; no subtask rows are read
+        task_fields = (
+            Task.id,
+            Task.title,
+            Task.description,
+            Task.rank,
+            Task.subtask_total,
+            Task.subtask_completed
+        )
+        if tasks_per_column is None:
+            query = (
+                select(Task.column_id, *task_fields)
+                .join(BoardColumn, Task.column_id == BoardColumn.id)
+                .where(BoardColumn.board_id == board_id)
+                .order_by(Task.column_id, Task.rank, Task.id)
+            )
+        else:
+            # First N per column through LATERAL: each column reads only its
+            # first N entries of ix_tasks_column_rank, however long it is.
+            # The totals come from a separate grouped count.
+            first_tasks = (
+                select(*task_fields)
+                .where(Task.column_id == BoardColumn.id)
+                .order_by(Task.rank, Task.id)
+                .limit(tasks_per_column)
+                .lateral()
+            )
+            query = (
+                select(BoardColumn.id.label("column_id"), first_tasks)
+                .join(first_tasks, true())
+                .where(BoardColumn.board_id == board_id)
+                .order_by(BoardColumn.id, first_tasks.c.rank, first_tasks.c.id)
+            )
+            counts = await self.db.execute(
+                select(Task.column_id, func.count())
+                .join(BoardColumn, Task.column_id == BoardColumn.id)
+                .where(BoardColumn.board_id == board_id)
+                .group_by(Task.column_id)
+            )
+            for column_id, task_count in counts.all():
+                by_id[column_id]["task_count"] = task_count
+        result = await self.db.execute(query)
 
-            for task in sorted(column.tasks, key=lambda t: t.position):
-                total = len(task.subtasks)
-                completed = sum(1 for s in task.subtasks if s.is_completed)
-                pending = total - completed
-
-                column_data["tasks"].append({
-                    "id": task.id,
-                    "title": task.title,
-                    "description": task.description,
-                    "position": task.position,
-                    "subtasks": {
-                        "total": total,
-                        "completed": completed,
-                        "pending": pending
-                    }
-                })
+        last_rows = {}
+        for row in result.all():
+            column_data = by_id[row.column_id]
+            column_data["tasks"].append({
+                "id": row.id,
+                "title": row.title,
+                "description": row.description,
+                "position": len(column_data["tasks"]) + 1,
+                "subtasks": {
+                    "total": row.subtask_total,
+                    "completed": row.subtask_completed,
+                    "pending": row.subtask_total - row.subtask_completed
+                }
+            })
+            last_rows[row.column_id] = row
 
-            columns.append(column_data)
+        for column_id, row in last_rows.items():
+            column_data = by_id[column_id]
+            loaded = len(column_data["tasks"])
+            if tasks_per_column is None:
+                column_data["task_count"] = loaded
+            elif loaded < column_data["task_count"]:
+                column_data["next_cursor"] = encode_cursor(id=row.id, position=loaded)
+
+        board_cache.put(view, board.id, board.version, columns)
 
         return {
             "success": True,
@@ -159,6 +226,7 @@ class ColumnService:
             "data": column,
             "error": None
         }
+    @transactional
     async def update_column(self, column_id: int, payload, current_user):
         result = await self.db.execute(
             select(BoardColumn).where(
@@ -175,30 +243,12 @@ class ColumnService:
             )
 
         if payload.name:
-            normalized = normalize_name(payload.name)
-            dup = await self.db.execute(
-                select(BoardColumn).where(
-                    BoardColumn.board_id == column.board_id,
-                    func.replace(
-                        func.replace(
-                            func.replace(func.lower(BoardColumn.name), ' ', ''),
-                            '-', ''
-                        ),
-                        '_', ''
-                    ) == normalized,
-                    BoardColumn.id != column_id
-                )
-            )
-            if dup.scalar_one_or_none():
-                raise AppException(
-                    message="Column name already exists in this board",
-                    status_code=status.HTTP_409_CONFLICT
-                )
-
             column.name = payload.name.strip()
+            await flush_unique(self.db, {
+                "uq_board_columns_board_name": "Column name already exists in this board"
+            })
 
-        await self.db.commit()
-        await self.db.refresh(column)
+        await bump_board_version(self.db, board_id=column.board_id)
 
         return {
             "success": True,
@@ -206,6 +256,7 @@ class ColumnService:
             "data": column,
             "error": None
         }
+    @transactional
     async def delete_column(self, column_id: int, current_user):
         result = await self.db.execute(
             select(BoardColumn).where(
@@ -222,7 +273,7 @@ class ColumnService:
             )
 
         await self.db.delete(column)
-        await self.db.commit()
+        await bump_board_version(self.db, board_id=column.board_id)
 
         return {
             "success": True,
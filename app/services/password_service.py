@@ -8,13 +8,14 @@ from app.models.users import AuthUser,RevokedToken
 from app.models.password import PasswordOTP
 from app.utils.mailer import send_otp
 from app.core.response import AppException
-from passlib.context import CryptContext
 from app.services.user_service import validate_password
 from app.validations.strong_pass import strongPassword
+from app.utils.identity_cache import identity_cache
+from app.utils.hashing import password_hasher
+from app.core.db import transactional, on_commit, release_connection
 
 
 # ------------------------------------------
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 OTP_EXPIRY_MINUTES= 3
 
 # ==============================================================
@@ -38,6 +39,7 @@ class PasswordService:
     # -------------------------------------------------------
     # 1️. Send OTP to Email
     # -------------------------------------------------------
+    @transactional
     async def send_otp(self, background_tasks: BackgroundTasks, email: str,):
         print(f"[OTP] Request received for email: {email}")
 
@@ -89,7 +91,7 @@ class PasswordService:
             )
             self.db.add(new_otp)
 
-        await self.db.commit()
+        await self.db.flush()
         print("[OTP] OTP saved successfully in DB")
 
         print("[OTP] Scheduling email sending task")
@@ -115,6 +117,7 @@ class PasswordService:
     # -------------------------------------------------------
     # 2. Verify OTP
     # -------------------------------------------------------
+    @transactional
     async def verify_otp(self, email: str, otp: int):
         record = await self.db.scalar(
             select(PasswordOTP).where(PasswordOTP.email == email, PasswordOTP.type == "otp")
@@ -156,7 +159,6 @@ class PasswordService:
 
         # mark verified
         record.is_verified = True
-        await self.db.commit()
 
         return {
             "success": True,
@@ -167,6 +169,7 @@ class PasswordService:
     # -------------------------------------------------------
     # 3️. Reset Password after OTP verification
     # -------------------------------------------------------
+    @transactional
     async def reset_password(
         self,
         email: str,
@@ -226,14 +229,18 @@ class PasswordService:
                 status_code=400
             )
 
-        #  Update password
-        user.password = pwd_context.hash(new_password)
+        #  Hash without holding a pooled connection; the writes below reopen one
+        await release_connection(self.db)
+        hashed_password = await password_hasher.hash(new_password)
+
+        #  Update password; bumping token_version revokes every issued token
+        user.password = hashed_password
+        user.token_version = AuthUser.token_version + 1
         self.db.add(user)
 
         #  Delete OTP
         await self.db.delete(otp_record)
-
-        await self.db.commit()
+        on_commit(self.db, lambda: identity_cache.invalidate(user.id))
 
         return {
             "success": True,
@@ -1,22 +1,73 @@
+import asyncio
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update, or_
 from fastapi import status
 from app.models.tasks import SubTask, Task, BoardColumn
+from app.core.config import settings
 from app.core.response import AppException
+from app.utils.board_cache import bump_board_version
+from app.core.db import db_instance, transactional, flush_unique
+
+# ---------------------------
+# Subtask counters on Task
+# ---------------------------
+def _counted_subtasks():
+    """Correlated (total, completed) counts of the subtasks of the outer Task row."""
+    total = (
+        select(func.count(SubTask.id))
+        .where(SubTask.task_id == Task.id)
+        .scalar_subquery()
+    )
+    completed = (
+        select(func.count(SubTask.id))
+        .where(SubTask.task_id == Task.id, SubTask.is_completed.is_(True))
+        .scalar_subquery()
+    )
+    return total, completed
+
+
+async def adjust_subtask_counters(db: AsyncSession, task_id: int, total: int = 0, completed: int = 0):
+    """Apply a delta to a task's counters; atomic, so concurrent writers don't lose updates."""
+    await db.execute(
+        update(Task)
+        .where(Task.id == task_id)
+        .values(
+            subtask_total=Task.subtask_total + total,
+            subtask_completed=Task.subtask_completed + completed
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def recount_subtask_counters(db: AsyncSession, task_id: int):
+    """Recompute a task's counters from the subtasks table (after bulk edits)."""
+    total, completed = _counted_subtasks()
+    await db.execute(
+        update(Task)
+        .where(Task.id == task_id)
+        .values(subtask_total=total, subtask_completed=completed)
+        .execution_options(synchronize_session=False)
+    )
+
 
 class SubTaskService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
     # CREATE SUBTASK
+    @transactional
     async def create_subtask(self, payload, current_user):
+        # Locked like _locked_subtask does, before the subtask is written
         task = await self.db.scalar(
-            select(Task).where(
+            select(Task)
+            .where(
                 Task.id == payload.task_id,
                 Task.column.has(
                     BoardColumn.board.has(user_id=current_user.id)
                 )
             )
+            .with_for_update()
         )
         if not task:
             raise AppException(
@@ -24,26 +75,19 @@ class SubTaskService:
                 status_code=status.HTTP_404_NOT_FOUND
             )
 
-        # Check duplicate subtask under same task
-        dup = await self.db.scalar(
-            select(SubTask).where(
-                SubTask.task_id == payload.task_id,
-                func.lower(SubTask.title) == payload.title.lower()
-            )
-        )
-        if dup:
-            raise AppException(
-                message="Subtask with this title already exists in this task",
-                status_code=status.HTTP_409_CONFLICT
-            )
-
+        # Duplicate titles under the same task are rejected by uq_subtasks_task_title
         subtask = SubTask(
             title=payload.title.strip(),
             task_id=payload.task_id
         )
         self.db.add(subtask)
-        await self.db.commit()
-        await self.db.refresh(subtask)
+        await flush_unique(self.db, {
+            "uq_subtasks_task_title": "Subtask with this title already exists in this task"
+        })
+        await adjust_subtask_counters(
+            self.db, task.id, total=1, completed=1 if subtask.is_completed else 0
+        )
+        await bump_board_version(self.db, column_id=task.column_id)
 
         return {
             "success": True,
@@ -70,8 +114,8 @@ class SubTaskService:
             select(SubTask).where(SubTask.task_id == task_id)
         )
         subtasks = result.scalars().all()
-        total = len(subtasks)
-        completed = sum(1 for s in subtasks if s.is_completed)
+        total = task.subtask_total
+        completed = task.subtask_completed
 
         data = [
             {"id": s.id, "title": s.title, "is_completed": s.is_completed}
@@ -85,45 +129,57 @@ class SubTaskService:
             "error": None
         }
 
-    # UPDATE SUBTASK
-    async def update_subtask(self, subtask_id: int, payload, current_user):
-        subtask = await self.db.scalar(
-            select(SubTask)
+    async def _locked_subtask(self, subtask_id: int, current_user):
+        """
+        Load an owned subtask for a write, locking its task row and then the
+        subtask row (the order update_task uses). is_completed can't change
+        until commit, so counter deltas computed from it are exact.
+        """
+        task_id = await self.db.scalar(
+            select(SubTask.task_id)
             .join(Task)
-            .join(Task.column)
             .where(
                 SubTask.id == subtask_id,
                 Task.column.has(BoardColumn.board.has(user_id=current_user.id))
             )
         )
+        subtask = None
+        if task_id is not None:
+            await self.db.execute(select(Task.id).where(Task.id == task_id).with_for_update())
+            # Re-read under the lock; a concurrent delete leaves nothing to update
+            subtask = await self.db.scalar(
+                select(SubTask)
+                .where(SubTask.id == subtask_id)
+                .with_for_update()
+                .execution_options(populate_existing=True)
+            )
         if not subtask:
             raise AppException(
                 message="Subtask not found or not accessible",
                 status_code=status.HTTP_404_NOT_FOUND
             )
+        return subtask
+
+    # UPDATE SUBTASK
+    @transactional
+    async def update_subtask(self, subtask_id: int, payload, current_user):
+        subtask = await self._locked_subtask(subtask_id, current_user)
 
-        # Update title with duplicate check
+        # Update title; duplicates are rejected by uq_subtasks_task_title
         if payload.title:
-            dup = await self.db.scalar(
-                select(SubTask).where(
-                    SubTask.task_id == subtask.task_id,
-                    func.lower(SubTask.title) == payload.title.lower(),
-                    SubTask.id != subtask_id
-                )
-            )
-            if dup:
-                raise AppException(
-                    message="Subtask with this title already exists in this task",
-                    status_code=status.HTTP_409_CONFLICT
-                )
             subtask.title = payload.title.strip()
+            await flush_unique(self.db, {
+                "uq_subtasks_task_title": "Subtask with this title already exists in this task"
+            })
 
         # Update completion status
-        if payload.is_completed is not None:
+        if payload.is_completed is not None and payload.is_completed != subtask.is_completed:
             subtask.is_completed = payload.is_completed
+            await adjust_subtask_counters(
+                self.db, subtask.task_id, completed=1 if payload.is_completed else -1
+            )
 
-        await self.db.commit()
-        await self.db.refresh(subtask)
+        await bump_board_version(self.db, task_id=subtask.task_id)
 
         return {
             "success": True,
@@ -137,24 +193,17 @@ class SubTaskService:
         }
 
     # DELETE SUBTASK
+    @transactional
     async def delete_subtask(self, subtask_id: int, current_user):
-        subtask = await self.db.scalar(
-            select(SubTask)
-            .join(Task)
-            .join(Task.column)
-            .where(
-                SubTask.id == subtask_id,
-                Task.column.has(BoardColumn.board.has(user_id=current_user.id))
-            )
-        )
-        if not subtask:
-            raise AppException(
-                message="Subtask not found or not accessible",
-                status_code=status.HTTP_404_NOT_FOUND
-            )
+        subtask = await self._locked_subtask(subtask_id, current_user)
 
+        task_id = subtask.task_id
+        await adjust_subtask_counters(
+            self.db, task_id, total=-1, completed=-1 if subtask.is_completed else 0
+        )
         await self.db.delete(subtask)
-        await self.db.commit()
+        await self.db.flush()
+        await bump_board_version(self.db, task_id=task_id)
 
         return {
             "success": True,
@@ -162,3 +211,69 @@ class SubTaskService:
             "data": None,
             "error": None
         }
+
+    # REPAIR SUBTASK COUNTERS
+    @transactional
+    async def repair_subtask_counters(self) -> int:
+        """
+        Maintenance job: recompute Task.subtask_total / subtask_completed wherever
+        they drifted from the subtasks table, in one set-based UPDATE. Returns the
+        number of tasks fixed; their boards' cached snapshots are invalidated.
+        """
+        total, completed = _counted_subtasks()
+        result = await self.db.execute(
+            update(Task)
+            .where(or_(Task.subtask_total != total, Task.subtask_completed != completed))
+            .values(subtask_total=total, subtask_completed=completed)
+            .returning(Task.column_id)
+            .execution_options(synchronize_session=False)
+        )
+        column_ids = result.scalars().all()
+        if column_ids:
+            board_ids = await self.db.scalars(
+                select(BoardColumn.board_id)
+                .where(BoardColumn.id.in_(set(column_ids)))
+                .distinct()
+                .order_by(BoardColumn.board_id)
+            )
+            for board_id in board_ids.all():
+                await bump_board_version(self.db, board_id=board_id)
+
+        print(f"[SUBTASKS] Repaired counters on {len(column_ids)} tasks")
+        return len(column_ids)
+
+
+# ---------------------------
+# Background counter repair
+# ---------------------------
+# The counters are kept by deltas on every subtask write; this loop catches any
+# drift (writes made outside the services, restored backups) every
+# SUBTASK_REPAIR_INTERVAL_SECONDS.
+_repair_task: Optional[asyncio.Task] = None
+
+
+async def _repair_loop() -> None:
+    while True:
+        await asyncio.sleep(settings.SUBTASK_REPAIR_INTERVAL_SECONDS)
+        try:
+            async with db_instance.db_connection() as session:
+                await SubTaskService(session).repair_subtask_counters()
+        except Exception as e:
+            print(f"[SUBTASKS ERROR] Counter repair failed: {e}")
+
+
+def start_subtask_repair() -> None:
+    global _repair_task
+    if _repair_task is None and settings.SUBTASK_REPAIR_INTERVAL_SECONDS > 0:
+        _repair_task = asyncio.create_task(_repair_loop())
+
+
+async def stop_subtask_repair() -> None:
+    global _repair_task
+    if _repair_task is not None:
+        _repair_task.cancel()
+        try:
+            await _repair_task
+        except asyncio.CancelledError:
+            pass
+        _repair_task = None
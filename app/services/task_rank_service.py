@@ -0,0 +1,207 @@
+import asyncio
+from typing import Optional
+from fastapi import status
+from sqlalchemy import select, update, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.tasks import Task
+from app.core.config import settings
+from app.core.db import db_instance, transactional, on_commit
+from app.core.response import AppException
+from app.utils.lexorank import rank_between, evenly_spaced_ranks
+from app.utils.board_cache import bump_board_version
+
+# First key of the two-key pg_advisory_xact_lock used for per-column locks
+COLUMN_LOCK_NAMESPACE = 7301
+
+# Columns with a rebalance in flight on this worker, and the asyncio tasks running them
+_pending_rebalances: set[int] = set()
+_background_tasks: set[asyncio.Task] = set()
+
+
+class TaskRankService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # -------------------------------------------------------
+    # Per-column locking
+    # -------------------------------------------------------
+    async def lock_columns(self, *column_ids: int) -> None:
+        """
+        Take transaction-scoped advisory locks on the given columns, always in id
+        order so two writers can't deadlock. Writers in other columns (and on the
+        rest of the board) are not blocked; locks release on commit or rollback.
+        """
+        for column_id in sorted(set(column_ids)):
+            await self.db.execute(
+                select(func.pg_advisory_xact_lock(COLUMN_LOCK_NAMESPACE, column_id))
+            )
+
+    # -------------------------------------------------------
+    # Rank for a 1-based position in a column
+    # -------------------------------------------------------
+    async def rank_for_position(
+        self,
+        column_id: int,
+        position: int,
+        exclude_task_id: Optional[int] = None
+    ) -> str:
+        """
+        Key that places a task at `position` (1-based) in the column, reading only
+        the two neighbours around the slot. Out-of-range positions clamp to the ends.
+        """
+        position = max(1, position)
+        query = select(Task.rank).where(Task.column_id == column_id)
+        if exclude_task_id is not None:
+            query = query.where(Task.id != exclude_task_id)
+
+        neighbours = (
+            await self.db.execute(
+                query.order_by(Task.rank, Task.id)
+                .offset(max(0, position - 2))
+                .limit(2 if position > 1 else 1)
+            )
+        ).scalars().all()
+
+        if position == 1:
+            before, after = None, (neighbours[0] if neighbours else None)
+        else:
+            before = neighbours[0] if neighbours else None
+            after = neighbours[1] if len(neighbours) > 1 else None
+            if before is None:
+                # Past the end of the column: append
+                before = await self.last_rank(column_id, exclude_task_id)
+
+        try:
+            return rank_between(before, after)
+        except ValueError:
+            # Duplicate keys around the slot; respace the column and retry once.
+            # The caller bumps the board after its own row writes (lock order)
+            await self.rebalance_column(column_id, bump_version=False)
+            return await self.rank_for_position(column_id, position, exclude_task_id)
+
+    # -------------------------------------------------------
+    # Rank next to a neighbouring task
+    # -------------------------------------------------------
+    async def rank_next_to(
+        self,
+        column_id: int,
+        before_id: Optional[int] = None,
+        after_id: Optional[int] = None,
+        exclude_task_id: Optional[int] = None
+    ) -> str:
+        """
+        Key for a slot directly below task `before_id` and/or directly above task
+        `after_id` (given both, they must be neighbours); neither appends to the
+        column. Reads the anchor and its one neighbour. A neighbour that is gone
+        from the column means the client's view is stale: 409.
+        """
+        in_column = [Task.column_id == column_id]
+        if exclude_task_id is not None:
+            in_column.append(Task.id != exclude_task_id)
+
+        async def anchor_rank(task_id: int) -> str:
+            rank = await self.db.scalar(select(Task.rank).where(Task.id == task_id, *in_column))
+            if rank is None:
+                raise AppException(
+                    message="Tasks were moved by another request, please retry",
+                    status_code=status.HTTP_409_CONFLICT
+                )
+            return rank
+
+        if before_id is None and after_id is None:
+            before, after = await self.last_rank(column_id, exclude_task_id), None
+        elif before_id is not None:
+            before = await anchor_rank(before_id)
+            below = (
+                await self.db.execute(
+                    select(Task.id, Task.rank)
+                    .where(*in_column, tuple_(Task.rank, Task.id) > tuple_(before, before_id))
+                    .order_by(Task.rank, Task.id)
+                    .limit(1)
+                )
+            ).first()
+            if after_id is not None and (below is None or below.id != after_id):
+                raise AppException(
+                    message="Tasks were moved by another request, please retry",
+                    status_code=status.HTTP_409_CONFLICT
+                )
+            after = below.rank if below else None
+        else:
+            after = await anchor_rank(after_id)
+            before = await self.db.scalar(
+                select(Task.rank)
+                .where(*in_column, tuple_(Task.rank, Task.id) < tuple_(after, after_id))
+                .order_by(Task.rank.desc(), Task.id.desc())
+                .limit(1)
+            )
+
+        try:
+            return rank_between(before, after)
+        except ValueError:
+            # Duplicate keys around the slot; respace the column and retry once
+            await self.rebalance_column(column_id, bump_version=False)
+            return await self.rank_next_to(column_id, before_id, after_id, exclude_task_id)
+
+    async def last_rank(self, column_id: int, exclude_task_id: Optional[int] = None) -> Optional[str]:
+        query = select(Task.rank).where(Task.column_id == column_id)
+        if exclude_task_id is not None:
+            query = query.where(Task.id != exclude_task_id)
+        return await self.db.scalar(query.order_by(Task.rank.desc(), Task.id.desc()).limit(1))
+
+    # -------------------------------------------------------
+    # Rebalancing
+    # -------------------------------------------------------
+    @transactional
+    async def rebalance_column(self, column_id: int, bump_version: bool = True) -> int:
+        """
+        Give every task in the column a fresh, evenly spaced key; order is preserved.
+        Not audited: the bulk UPDATE skips the flush listeners, and respacing
+        changes no task's visible position. It does bump the board version:
+        cached snapshots, ETags and page cursors hold the old keys.
+        """
+        await self.lock_columns(column_id)
+        task_ids = (
+            await self.db.execute(
+                select(Task.id)
+                .where(Task.column_id == column_id)
+                .order_by(Task.rank, Task.id)
+            )
+        ).scalars().all()
+
+        ranks = evenly_spaced_ranks(len(task_ids))
+        if task_ids:
+            await self.db.execute(
+                update(Task),
+                [{"id": task_id, "rank": rank} for task_id, rank in zip(task_ids, ranks)]
+            )
+            if bump_version:
+                await bump_board_version(self.db, column_id=column_id)
+        return len(task_ids)
+
+    def rebalance_if_needed(self, column_id: int, rank: str) -> None:
+        """Schedule a background respace of the column once its keys grow too long."""
+        if len(rank) > settings.TASK_RANK_MAX_LENGTH:
+            on_commit(self.db, lambda: schedule_rebalance(column_id))
+
+
+# ---------------------------
+# Background rebalancer
+# ---------------------------
+def schedule_rebalance(column_id: int) -> None:
+    if column_id in _pending_rebalances:
+        return
+    _pending_rebalances.add(column_id)
+    task = asyncio.create_task(_rebalance_in_background(column_id))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _rebalance_in_background(column_id: int) -> None:
+    try:
+        async with db_instance.db_connection() as session:
+            count = await TaskRankService(session).rebalance_column(column_id)
+        print(f"[RANK] Rebalanced column {column_id} ({count} tasks)")
+    except Exception as e:
+        print(f"[RANK ERROR] Rebalance of column {column_id} failed: {e}")
+    finally:
+        _pending_rebalances.discard(column_id)
@@ -2,9 +2,16 @@ from fastapi import status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.tasks import Board,BoardColumn,Task,SubTask
 from app.core.response import AppException
-from app.services.column_service import normalize_name
-from sqlalchemy import select, func,update
-from app.schema.task_schema import TaskMove
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.orm import aliased
+from app.schema.task_schema import TaskMove, TaskReorder
+from app.services.task_rank_service import TaskRankService
+from app.services.sub_task_service import recount_subtask_counters
+from app.utils.lexorank import rank_between
+from app.utils.board_cache import bump_board_version
+from app.core.db import transactional, flush_unique, unique_conflicts
+from app.core.config import settings
+from app.utils.pagination import encode_cursor, decode_cursor, page_size
 
 
 class TaskService:
@@ -15,71 +22,65 @@ class TaskService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    @transactional
     async def create_task(self, payload, current_user):
-        print("➡️ CREATE TASK CALLED")
-        print("Payload:", payload.model_dump())
-        column = await self.db.scalar(
-            select(BoardColumn).where(
-                BoardColumn.id == payload.column_id,
-                BoardColumn.board.has(user_id=current_user.id)
+        # Validate the request body before touching the database
+        subtask_titles = []
+        seen = set()
+        for sub in payload.subtasks or []:
+            key = sub.title.strip().lower()
+            if key in seen:
+                raise AppException("Duplicate subtasks in request", status_code=409)
+            seen.add(key)
+            subtask_titles.append(sub.title.strip())
+
+        # Concurrent creates in this column wait here, so the last key is stable
+        await TaskRankService(self.db).lock_columns(payload.column_id)
+
+        # Ownership, last key and task count in one query
+        in_column = Task.column_id == BoardColumn.id
+        row = (
+            await self.db.execute(
+                select(
+                    BoardColumn,
+                    select(func.max(Task.rank)).where(in_column).scalar_subquery(),
+                    select(func.count(Task.id)).where(in_column).scalar_subquery()
+                )
+                .where(
+                    BoardColumn.id == payload.column_id,
+                    BoardColumn.board.has(user_id=current_user.id)
+                )
             )
-        )
-        if not column:
+        ).first()
+        if not row:
             raise AppException(
                 message="Column not found",
                 status_code=status.HTTP_404_NOT_FOUND
             )
-        print("Column found:", bool(column))
-        normalized = normalize_name(payload.title)
-        dup = await self.db.scalar(
-                select(Task).where(
-                    Task.column_id == payload.column_id,
-                    func.replace(
-                        func.replace(
-                            func.replace(func.lower(Task.title), ' ', ''),
-                            '-', ''
-                        ),
-                        '_', ''
-                    ) == normalized))
-        if dup:
-            raise AppException(
-                message="Task with this title already exists in this column",
-                status_code=status.HTTP_409_CONFLICT
-            )
-        last_position = await self.db.scalar(
-            select(func.max(Task.position))
-            .where(Task.column_id == payload.column_id)
-        )
-        next_position = (last_position or 0) + 1
+
+        column, last_rank, task_count = row
+
+        # Task and subtasks go out in one flush: the task INSERT ... RETURNING id,
+        # then a single batched INSERT ... RETURNING for all subtasks.
+        # Duplicate titles are rejected by uq_tasks_column_title
+        rank = rank_between(last_rank, None)
         task = Task(
             title=payload.title.strip(),
             description=payload.description,
-            column_id=payload.column_id,
-            position=next_position
+            column_id=column.id,
+            rank=rank,
+            subtasks=[SubTask(title=title) for title in subtask_titles],
+            subtask_total=len(subtask_titles),
+            subtask_completed=0
         )
         self.db.add(task)
-        await self.db.flush() 
-        print("SUBTASKS PAYLOAD:", payload.subtasks)
-        if payload.subtasks:
-            seen = set()
-            for sub in payload.subtasks:
-                key = sub.title.strip().lower()
-                if key in seen:
-                    raise AppException("Duplicate subtasks in request", status_code=409)
-                seen.add(key)
-
-                self.db.add(
-                    SubTask(
-                        title=sub.title.strip(),
-                        task_id=task.id
-                    )
-                )
+        await flush_unique(self.db, {
+            "uq_tasks_column_title": "Task with this title already exists in this column",
+            "uq_subtasks_task_title": "Duplicate subtasks in request"
+        })
 
-        await self.db.commit()
-        result = await self.db.execute(
-            select(SubTask).where(SubTask.task_id == task.id)
-        )
-        subtasks = result.scalars().all()
+        TaskRankService(self.db).rebalance_if_needed(column.id, rank)
+        await bump_board_version(self.db, board_id=column.board_id)
         return {
             "success": True,
             "message": "Task created successfully",
@@ -88,21 +89,47 @@ class TaskService:
                 "title": task.title,
                 "description": task.description,
                 "status": column.name,
-                "position": task.position,
+                "position": task_count + 1,
                 "subtasks": [
                     {
                         "id": sub.id,
                         "title": sub.title,
                         "is_completed": sub.is_completed
                     }
-                    for sub in subtasks
+                    for sub in task.subtasks
                 ]
             },
             "error": None
         }
 
 
-    async def get_tasks(self, column_id: int, current_user):
+    async def get_column_board_version(self, column_id: int, current_user) -> int:
+        version = await self.db.scalar(
+            select(Board.version)
+            .join(BoardColumn, BoardColumn.board_id == Board.id)
+            .where(
+                BoardColumn.id == column_id,
+                Board.user_id == current_user.id
+            )
+        )
+
+        if version is None:
+            raise AppException(
+                message="Column not found",
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+
+        return version
+
+    async def get_tasks(self, column_id: int, current_user, limit: int = None, cursor: str = None):
+        """
+        One page of a column's tasks in board order, keyset-paginated on (rank, id).
+        The cursor names the last task shown; its rank is read at query time, so a
+        rebalance between pages (which rewrites every rank) doesn't break paging.
+        """
+        limit = page_size(limit, settings.TASK_PAGE_SIZE, settings.TASK_PAGE_SIZE_MAX)
+        after = decode_cursor(cursor, id=int, position=int)
+
         column = await self.db.scalar(
             select(BoardColumn).where(
                 BoardColumn.id == column_id,
@@ -116,34 +143,76 @@ class TaskService:
                 status_code=status.HTTP_404_NOT_FOUND
             )
 
-        result = await self.db.execute(
-                select(Task, BoardColumn.name)
-                .join(BoardColumn, Task.column_id == BoardColumn.id)
-                .where(Task.column_id == column_id)
-                .order_by(Task.position)
+        query = (
+            select(Task.id, Task.title, Task.description, Task.column_id, Task.rank)
+            .where(Task.column_id == column_id)
+            .order_by(Task.rank, Task.id)
+            .limit(limit + 1)
+        )
+        if after:
+            anchor = aliased(Task)
+            anchor_rank = (
+                select(anchor.rank)
+                .where(anchor.id == after["id"], anchor.column_id == column_id)
+                .scalar_subquery()
             )
+            query = query.where(tuple_(Task.rank, Task.id) > tuple_(anchor_rank, after["id"]))
+        rows = (await self.db.execute(query)).all()
+
+        # An empty page is also what a cursor whose task has since left the
+        # column gets; tell that apart so the client reloads instead of stopping
+        if after and not rows and not await self.db.scalar(
+            select(Task.id).where(Task.id == after["id"], Task.column_id == column_id)
+        ):
+            raise AppException(
+                message="The column changed since this page was loaded, please reload it",
+                status_code=status.HTTP_409_CONFLICT
+            )
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        start = after["position"] + 1 if after else 1
+
         tasks = []
-        for task, column_name in result.all():
+        for position, task in enumerate(rows, start=start):
             tasks.append({
                 "id": task.id,
                 "title": task.title,
                 "description": task.description,
                 "column_id": task.column_id,
-                "status": column_name,  
-                "position": task.position
+                "status": column.name,
+                "position": position
             })
 
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = encode_cursor(id=last.id, position=start + len(rows) - 1)
+
         return {
             "success": True,
             "message": "Tasks fetched successfully",
-            "data": tasks,
+            "data": {
+                "tasks": tasks,
+                "next_cursor": next_cursor,
+                "has_more": has_more
+            },
             "error": None
         }
     
     async def get_task_by_id(self, task_id: int, current_user):
-        # Fetch task + column name
+        # Fetch task + column name + its 1-based position in the column
+        earlier = aliased(Task)
+        position = (
+            select(func.count(earlier.id) + 1)
+            .where(
+                earlier.column_id == Task.column_id,
+                tuple_(earlier.rank, earlier.id) < tuple_(Task.rank, Task.id)
+            )
+            .scalar_subquery()
+        )
         result = await self.db.execute(
-            select(Task, BoardColumn.name)
+            select(Task, BoardColumn.name, position)
             .join(BoardColumn, Task.column_id == BoardColumn.id)
             .where(
                 Task.id == task_id,
@@ -159,7 +228,7 @@ class TaskService:
                 status_code=status.HTTP_404_NOT_FOUND
             )
 
-        task, column_name = row
+        task, column_name, position = row
         subtask_result = await self.db.execute(
             select(SubTask).where(SubTask.task_id == task.id)
         )
@@ -174,7 +243,7 @@ class TaskService:
                 "description": task.description,
                 "column_id": task.column_id,
                 "status": column_name,
-                "position": task.position,
+                "position": position,
                 "subtasks": [
                     {
                         "id": sub.id,
@@ -190,44 +259,29 @@ class TaskService:
 
 
     
+    @transactional
     async def update_task(self, task_id: int, payload, current_user):
-        task = await self.db.scalar(
-            select(Task)
-            .join(BoardColumn)
-            .where(
-                Task.id == task_id,
-                BoardColumn.board.has(user_id=current_user.id)
+        row = (
+            await self.db.execute(
+                select(Task, BoardColumn.board_id)
+                .join(BoardColumn)
+                .where(
+                    Task.id == task_id,
+                    BoardColumn.board.has(user_id=current_user.id)
+                )
             )
-        )
+        ).first()
 
-        if not task:
+        if not row:
             raise AppException(
                 message="Task not found",
                 status_code=status.HTTP_404_NOT_FOUND
             )
+        task, source_board_id = row
 
-        
-        if payload.title:
-            dup = await self.db.execute(
-                select(Task).where(
-                    Task.column_id == task.column_id,
-                    func.lower(Task.title) == payload.title.lower(),
-                    Task.id != task_id
-                )
-            )
-            if dup.scalar_one_or_none():
-                raise AppException(
-                    message="Task title already exists in this column",
-                    status_code=status.HTTP_409_CONFLICT
-                )
-
-            task.title = payload.title.strip()
-
-        
-        if payload.description is not None:
-            task.description = payload.description
-
-        
+        # Lock order for every task write: column locks, then rows, then the
+        # board version bumps (ascending board id), so writers can't deadlock
+        column = None
         if payload.column_id is not None:
             column = await self.db.scalar(
                 select(BoardColumn).where(
@@ -242,47 +296,101 @@ class TaskService:
                     status_code=status.HTTP_404_NOT_FOUND
                 )
 
-            task.column_id = payload.column_id
+            if column.id != task.column_id:
+                ranks = TaskRankService(self.db)
+                source_column_id = task.column_id
+                await ranks.lock_columns(source_column_id, column.id)
+
+                # Re-read under the locks; the task may have been moved meanwhile
+                task = await self.db.scalar(
+                    select(Task)
+                    .where(Task.id == task_id)
+                    .with_for_update()
+                    .execution_options(populate_existing=True)
+                )
+                if not task or task.column_id != source_column_id:
+                    raise AppException(
+                        message="Task was moved by another request, please retry",
+                        status_code=status.HTTP_409_CONFLICT
+                    )
+
+        if payload.description is not None:
+            task.description = payload.description
+
+        if column is not None and column.id != task.column_id:
+            # Append to the end of the new column
+            task.rank = rank_between(await ranks.last_rank(column.id), None)
+            ranks.rebalance_if_needed(column.id, task.rank)
+            task.column_id = column.id
+
+        # Checked against the column the task ends up in
+        if payload.title:
+            task.title = payload.title.strip()
+        await flush_unique(self.db, {
+            "uq_tasks_column_title": "Task title already exists in this column"
+        })
           
         if payload.subtasks is not None:
+            # Task row before its subtasks, as the subtask endpoints lock them, so
+            # the recount below can't interleave with a concurrent subtask write
+            await self.db.execute(select(Task.id).where(Task.id == task.id).with_for_update())
+            result = await self.db.execute(
+                select(SubTask).where(SubTask.task_id == task.id)
+            )
+            existing_subtasks = {st.id: st for st in result.scalars().all()}
+            incoming_ids = {sub.id for sub in payload.subtasks if sub.id}
+
+            for sub_id in incoming_ids:
+                if sub_id not in existing_subtasks:
+                    raise AppException(
+                        message=f"Subtask {sub_id} not found",
+                        status_code=status.HTTP_404_NOT_FOUND
+                    )
 
-            existing_subtasks = {st.id: st for st in task.subtasks}
-            incoming_ids = set()
+            # Delete removed subtasks first so their titles are free again
+            for st_id, st in existing_subtasks.items():
+                if st_id not in incoming_ids:
+                    await self.db.delete(st)
+            await self.db.flush()
 
             for sub in payload.subtasks:
 
                 # Update existing subtask
                 if sub.id:
-                    if sub.id not in existing_subtasks:
-                        raise AppException(
-                            message=f"Subtask {sub.id} not found",
-                            status_code=status.HTTP_404_NOT_FOUND
-                        )
-
                     st = existing_subtasks[sub.id]
-                    st.title = sub.title.strip()
-                    st.isCompleted = sub.isCompleted
-                    incoming_ids.add(sub.id)
+                    if sub.title:
+                        st.title = sub.title.strip()
+                    if sub.is_completed is not None:
+                        st.is_completed = sub.is_completed
 
                 # Create new subtask
                 else:
-                    new_subtask = SubTask(
-                        title=sub.title.strip(),
-                        isCompleted=sub.isCompleted,
-                        task_id=task.id
+                    if not sub.title:
+                        raise AppException(
+                            message="Subtask title is required",
+                            status_code=status.HTTP_400_BAD_REQUEST
+                        )
+                    self.db.add(
+                        SubTask(
+                            title=sub.title.strip(),
+                            is_completed=bool(sub.is_completed),
+                            task_id=task.id
+                        )
                     )
-                    self.db.add(new_subtask)
 
-            # Delete removed subtasks
-            for st_id, st in existing_subtasks.items():
-                if st_id not in incoming_ids:
-                    await self.db.delete(st)
+            await flush_unique(self.db, {
+                "uq_subtasks_task_title": "Subtask with this title already exists in this task"
+            })
+            await recount_subtask_counters(self.db, task.id)
 
-            
-        
+        await self.db.flush()
 
-        await self.db.commit()
-        await self.db.refresh(task)
+        # Invalidate the board the task lived on and, if it moved, the new one
+        board_ids = {source_board_id}
+        if column is not None:
+            board_ids.add(column.board_id)
+        for board_id in sorted(board_ids):
+            await bump_board_version(self.db, board_id=board_id)
 
         return {
             "success": True,
@@ -296,6 +404,7 @@ class TaskService:
             "error": None
         }
 
+    @transactional
     async def delete_task(self, task_id: int, current_user):
         task = await self.db.scalar(
             select(Task).where(
@@ -312,8 +421,10 @@ class TaskService:
                 status_code=status.HTTP_404_NOT_FOUND
             )
 
+        column_id = task.column_id
         await self.db.delete(task)
-        await self.db.commit()
+        await self.db.flush()
+        await bump_board_version(self.db, column_id=column_id)
 
         return {
             "success": True,
@@ -321,19 +432,23 @@ class TaskService:
             "data": None,
             "error": None
         }
+    @transactional
     async def move_task(self, payload: TaskMove, current_user):
 
-        task = await self.db.scalar(
-            select(Task)
-            .join(BoardColumn)
-            .where(
-                Task.id == payload.task_id,
-                BoardColumn.board.has(user_id=current_user.id)
+        row = (
+            await self.db.execute(
+                select(Task, BoardColumn.board_id)
+                .join(BoardColumn)
+                .where(
+                    Task.id == payload.task_id,
+                    BoardColumn.board.has(user_id=current_user.id)
+                )
             )
-        )
+        ).first()
 
-        if not task:
-            raise AppException("Task not found", status.HTTP_404_NOT_FOUND)
+        if not row:
+            raise AppException("Task not found", status_code=status.HTTP_404_NOT_FOUND)
+        task, source_board_id = row
 
         # Validate destination column
         dest_column = await self.db.scalar(
@@ -344,35 +459,145 @@ class TaskService:
         )
 
         if not dest_column:
-            raise AppException("Target column not found", status.HTTP_404_NOT_FOUND)
+            raise AppException("Target column not found", status_code=status.HTTP_404_NOT_FOUND)
 
-        #  Close gap in source column
-        await self.db.execute(
-            update(Task)
-            .where(
-                Task.column_id == payload.source_column_id,
-                Task.position > task.position
-            )
-            .values(position=Task.position - 1)
-        )
+        #  Serialize writers on the source and destination columns only
+        ranks = TaskRankService(self.db)
+        source_column_id = task.column_id
+        await ranks.lock_columns(source_column_id, dest_column.id)
 
-        #  Make space in destination column
-        await self.db.execute(
-            update(Task)
-            .where(
-                Task.column_id == payload.destination_column_id,
-                Task.position >= payload.destination_position
+        #  Re-read under the locks; the task may have been moved meanwhile
+        task = await self.db.scalar(
+            select(Task)
+            .where(Task.id == payload.task_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        if not task or task.column_id != source_column_id:
+            raise AppException(
+                message="Task was moved by another request, please retry",
+                status_code=status.HTTP_409_CONFLICT
             )
-            .values(position=Task.position + 1)
+
+        #  New key between the destination neighbours; no other rows change
+        rank = await ranks.rank_for_position(
+            dest_column.id,
+            payload.destination_position,
+            exclude_task_id=task.id
         )
 
         #  Move task
         task.column_id = payload.destination_column_id
-        task.position = payload.destination_position
+        task.rank = rank
+        ranks.rebalance_if_needed(dest_column.id, rank)
+        await flush_unique(self.db, {
+            "uq_tasks_column_title": "Task with this title already exists in the destination column"
+        })
 
-        await self.db.commit()
+        #  Board versions last, in id order, like every other task write
+        for board_id in sorted({source_board_id, dest_column.board_id}):
+            await bump_board_version(self.db, board_id=board_id)
 
         return {
             "success": True,
             "message": "Task moved successfully"
         }
+
+    @transactional
+    async def reorder_tasks(self, payload: TaskReorder, current_user):
+        """
+        Apply several moves (a multi-task drag) in one transaction. Each move puts
+        a task next to its new neighbours like move_task does, so only the moved
+        rows are rewritten and a client holding one page of a column can reorder
+        it. Moves apply in order; a later move may use an earlier one's task as
+        its neighbour. Respacing a whole column is left to rebalance_column.
+        """
+        task_ids = [move.task_id for move in payload.moves]
+        column_ids = {move.column_id for move in payload.moves}
+
+        if len(set(task_ids)) != len(task_ids):
+            raise AppException(
+                message="A task may appear only once",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        if any(move.task_id in (move.before_id, move.after_id) for move in payload.moves):
+            raise AppException(
+                message="A task can't be placed next to itself",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Owned destination columns
+        result = await self.db.execute(
+            select(BoardColumn.id, BoardColumn.board_id)
+            .join(Board, Board.id == BoardColumn.board_id)
+            .where(
+                BoardColumn.id.in_(column_ids),
+                Board.user_id == current_user.id
+            )
+        )
+        column_boards = dict(result.all())
+        if len(column_boards) != len(column_ids):
+            raise AppException(
+                message="Column not found",
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+
+        # Lock the destination columns and every column a moved task comes from
+        source_column_ids = (
+            await self.db.execute(
+                select(Task.column_id).where(Task.id.in_(task_ids)).distinct()
+            )
+        ).scalars().all()
+        locked = column_ids | set(source_column_ids)
+        ranks = TaskRankService(self.db)
+        await ranks.lock_columns(*locked)
+
+        # Re-read the moved tasks under the locks
+        result = await self.db.execute(
+            select(Task, BoardColumn.board_id)
+            .join(BoardColumn, Task.column_id == BoardColumn.id)
+            .join(Board, Board.id == BoardColumn.board_id)
+            .where(Task.id.in_(task_ids), Board.user_id == current_user.id)
+            .with_for_update(of=Task)
+            .execution_options(populate_existing=True)
+        )
+        tasks = {task.id: (task, board_id) for task, board_id in result.all()}
+        if len(tasks) != len(task_ids):
+            raise AppException(
+                message="Task not found",
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+        if any(task.column_id not in locked for task, _ in tasks.values()):
+            raise AppException(
+                message="Tasks were moved by another request, please retry",
+                status_code=status.HTTP_409_CONFLICT
+            )
+        board_ids = {board_id for _, board_id in tasks.values()} | set(column_boards.values())
+
+        # Neighbour reads autoflush the earlier moves, so a title clash can
+        # surface on any of them
+        moved = []
+        with unique_conflicts({
+            "uq_tasks_column_title": "Task with this title already exists in the destination column"
+        }):
+            for move in payload.moves:
+                task, _ = tasks[move.task_id]
+                rank = await ranks.rank_next_to(
+                    move.column_id, move.before_id, move.after_id, exclude_task_id=task.id
+                )
+                task.column_id = move.column_id
+                task.rank = rank
+                ranks.rebalance_if_needed(move.column_id, rank)
+                moved.append({"id": task.id, "column_id": move.column_id})
+            await self.db.flush()
+
+        # Source boards of moved tasks and every destination board
+        for board_id in sorted(board_ids):
+            await bump_board_version(self.db, board_id=board_id)
+
+        return {
+            "success": True,
+            "message": "Tasks reordered successfully",
+            "data": {"tasks": moved},
+            "error": None
+        }
@@ -1,4 +1,5 @@
 import os
+import json
 import uuid
 import re
 from datetime import date
@@ -10,14 +11,16 @@ from app.utils.mailer import user_registered
 from fastapi import UploadFile, BackgroundTasks, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from passlib.context import CryptContext
 import cloudinary.uploader
 
 from app.models.users import AuthUser
 from app.core.response import AppException
+from app.utils.identity_cache import identity_cache
+from app.utils.hashing import password_hasher
+from app.core.db import transactional, on_commit, db_instance, release_connection
+from app.core.config import settings
+from app.utils.pagination import encode_cursor, decode_cursor, page_size
 from typing import List
-# Password hashing
-pass_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 MAX_BCRYPT_BYTES = 72
 
 # Image upload
@@ -26,16 +29,16 @@ BASE_UPLOAD_DIR = "uploads"
 PROFILE_IMAGE = "profile_image"
 def normalize_image_url(path: str | None):
     return path.replace("\\", "/") if path else None
-def hash_password(password: str) -> str:
+async def hash_password(password: str) -> str:
     """
-    Hash password safely for bcrypt.
+    Hash password safely for bcrypt, off the event loop.
     Truncate to 72 bytes because bcrypt cannot handle more.
     """
     password_bytes = password.encode("utf-8")
     if len(password_bytes) > MAX_BCRYPT_BYTES:
         password_bytes = password_bytes[:MAX_BCRYPT_BYTES]
     truncated_password = password_bytes.decode("utf-8", errors="ignore")
-    return pass_context.hash(truncated_password)
+    return await password_hasher.hash(truncated_password)
 
 def validate_password(password: str):
     """
@@ -109,10 +112,41 @@ async def save_media(file: UploadFile, folder: str):
     )
 
     return result["secure_url"]
+
+
+# ---------------- USER LISTING ----------------
+# Only the fields the listing returns; never the password hash
+USER_LIST_COLUMNS = (
+    AuthUser.id,
+    AuthUser.full_name,
+    AuthUser.email,
+    AuthUser.age,
+    AuthUser.profile_image,
+)
+
+
+async def stream_all_users():
+    """
+    Every user as NDJSON lines, newest first, read through a server-side cursor
+    in USER_STREAM_BATCH_SIZE batches. Opens its own session: the streamed
+    response outlives the request-scoped one.
+    """
+    connection = db_instance.replica_connection if db_instance.has_replica else db_instance.db_connection
+    async with connection() as session:
+        result = await session.stream(
+            select(*USER_LIST_COLUMNS)
+            .order_by(desc(AuthUser.id))
+            .execution_options(yield_per=settings.USER_STREAM_BATCH_SIZE)
+        )
+        async for row in result:
+            yield json.dumps(dict(row._mapping)) + "\n"
+
+
 class UserService:
     def __init__(self, db: AsyncSession):
         self.db = db
 # ---------------- create users ----------------
+    @transactional
     async def create_user_form(
         self,
         background_tasks: BackgroundTasks,
@@ -148,6 +182,9 @@ class UserService:
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
 
+        # Upload and hashing are slow; give the connection back until the insert
+        await release_connection(self.db)
+
         # ---------------- PROFILE IMAGE ----------------
         image_path=None
         if profile_image:
@@ -157,7 +194,7 @@ class UserService:
         try:
                    
             final_pass=validate_password(password)
-            hashed_password = hash_password(final_pass)
+            hashed_password = await hash_password(final_pass)
 
         # ---------------- SAVE USER ----------------
             new_user = AuthUser(
@@ -174,8 +211,7 @@ class UserService:
             )
 
             self.db.add(new_user)
-            await self.db.commit()
-            await self.db.refresh(new_user)
+            await self.db.flush()
             background_tasks.add_task(
                 user_registered, 
                 to_email=new_user.email,
@@ -198,36 +234,36 @@ class UserService:
 
         
         except AppException as e:
-            await self.db.rollback()
             raise e
         
         except Exception as e:
-            await self.db.rollback()
             raise AppException(
                 message="Unexpected error occurred",
                 error=str(e),
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
     # ---------------- GET ALL USERS ----------------
-    async def get_all_users(self):
-        result = await self.db.execute(select(AuthUser).order_by(desc(AuthUser.id)))
-        users = result.scalars().all()
+    async def get_all_users(self, limit: int = None, cursor: str = None):
+        """One page of users, newest first, keyset-paginated on id."""
+        limit = page_size(limit, settings.USER_PAGE_SIZE, settings.USER_PAGE_SIZE_MAX)
+        after = decode_cursor(cursor, id=int)
 
-        user_list = [
-            {
-                "id": user.id,
-                "full_name": user.full_name,
-                "email": user.email,
-                "age": user.age,
-                "profile_image": user.profile_image,
-            }
-            for user in users
-        ]
+        query = select(*USER_LIST_COLUMNS).order_by(desc(AuthUser.id)).limit(limit + 1)
+        if after:
+            query = query.where(AuthUser.id < after["id"])
+        rows = (await self.db.execute(query)).all()
+
+        has_more = len(rows) > limit
+        user_list = [dict(row._mapping) for row in rows[:limit]]
 
         return {
             "success": True,
             "message": "Users fetched successfully",
-            "data": user_list,
+            "data": {
+                "users": user_list,
+                "next_cursor": encode_cursor(id=user_list[-1]["id"]) if has_more else None,
+                "has_more": has_more,
+            },
             "error": None,
         }
 
@@ -255,6 +291,7 @@ class UserService:
             "error": None,
         }
     # ---------------- UPDATE USERS ----------------
+    @transactional
     async def update_user(
         self,
         user_id: int,
@@ -308,8 +345,8 @@ class UserService:
             user.profile_image=image_path
            
 
-        await self.db.commit()
-        await self.db.refresh(user)
+        await self.db.flush()
+        on_commit(self.db, lambda: identity_cache.invalidate(user.id))
 
         return {
             "success": True,
@@ -324,6 +361,7 @@ class UserService:
             "error": None,
         }
     # ---------------- DELETE USERS ----------------
+    @transactional
     async def delete_user(self, user_id: int):
         result = await self.db.execute(select(AuthUser).where(AuthUser.id == user_id))
         user = result.scalars().first()
@@ -331,7 +369,7 @@ class UserService:
             raise AppException(message="User not found", error="NOT_FOUND", status_code=404)
 
         await self.db.delete(user)
-        await self.db.commit()
+        on_commit(self.db, lambda: identity_cache.invalidate(user_id))
 
         return {
             "success": True,
@@ -3,15 +3,27 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.crud.base import create_login_audit_log
 from contextvars import ContextVar
 from sqlalchemy.orm import Mapper
-from typing import Optional, Dict, Any
-import json
-from datetime import datetime, date
-from sqlalchemy import event, inspect
+from typing import Optional, Dict, Any, Tuple
+from dataclasses import dataclass, field
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, date, time as time_of_day
+from decimal import Decimal
+from enum import Enum
+from uuid import UUID
+from sqlalchemy import event, inspect, insert, select
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
 from app.models.audit import AuditLog
+from app.models.tasks import BoardColumn, Task
 from app.core.db import db_instance
+from app.core.config import settings
 from contextlib import asynccontextmanager
 
+logger = logging.getLogger(__name__)
+
 
 async def log_audit(
     db: AsyncSession,
@@ -52,83 +64,443 @@ current_ip = ContextVar("current_ip", default=None)
 
 # ------------------ AUDIT LOG MODEL ------------------
 
-# ------------------ AUDIT LOG HELPER ------------------
-def safe_json_dumps(data):
-    """Safely serialize data to JSON, converting datetime and other non-serializable types."""
-    def default(o):
-        if isinstance(o, (date, datetime)):
-            return o.isoformat()
-        if isinstance(o, set):
-            return list(o)
-        return str(o)
+# ------------------ CHANGE ENCODING ------------------
+# Values are converted to JSON-native types once, by exact-type lookup, and the
+# resulting dict is stored as a JSONB object (encoded a single time by the driver).
+_JSON_NATIVE = {str, int, float, bool, type(None)}
 
-    return json.dumps(data, default=default)
 
+def _iso(value):
+    return value.isoformat()
+
+
+def _items(value):
+    return [encode_value(item) for item in value]
+
+
+_ENCODERS = {
+    datetime: _iso,
+    date: _iso,
+    time_of_day: _iso,
+    # Kept as strings so no precision is lost
+    Decimal: str,
+    UUID: str,
+    set: _items,
+    frozenset: _items,
+    bytes: bytes.hex,
+}
+
+
+def encode_value(value):
+    kind = type(value)
+    if kind in _JSON_NATIVE:
+        return value
+    encoder = _ENCODERS.get(kind)
+    if encoder is not None:
+        return encoder(value)
+    if isinstance(value, dict):
+        return {str(key): encode_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(item) for item in value]
+    if isinstance(value, Enum):
+        return encode_value(value.value)
+    # Subclasses of the types above, then anything else
+    for base, base_encoder in _ENCODERS.items():
+        if isinstance(value, base):
+            return base_encoder(value)
+    return str(value)
+
+
+# ------------------ AUDIT PLANS ------------------
+# What to capture for each mapped class is worked out once per mapper from the
+# AUDIT_* settings, so a flush only touches the column attributes in the plan.
+_AUDIT_INTERNAL_TABLES = {"audit_logs", "audit_log_summaries"}
+
+
+def _setting_list(value: str) -> list:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+_excluded_tables = _AUDIT_INTERNAL_TABLES | set(_setting_list(settings.AUDIT_EXCLUDED_TABLES))
+_excluded_columns = set(_setting_list(settings.AUDIT_EXCLUDED_COLUMNS))
+_sampled_columns = {
+    name: float(rate)
+    for name, rate in (item.rsplit(":", 1) for item in _setting_list(settings.AUDIT_SAMPLED_COLUMNS))
+}
+
+
+@dataclass(frozen=True)
+class AuditPlan:
+    table_name: str
+    enabled: bool
+    # (attribute key, column name) pairs to capture
+    columns: Tuple[Tuple[str, str], ...] = ()
+    # attribute key -> probability of recording an UPDATE that only changes sampled keys
+    sampled: Dict[str, float] = field(default_factory=dict)
+
+
+_plans: Dict[Mapper, AuditPlan] = {}
 
-# ------------------ AUDIT LOG FUNCTION ------------------
-def add_audit_log(session, instance, action, changes=None):
-    """Create an audit entry for CREATE, UPDATE, DELETE actions."""
-    try:
-        # ✅ Skip auditing itself or any other excluded tables
-        if isinstance(instance, AuditLog) or instance.__tablename__ in {"audit_logs", "audit_logs_new"}:
-            return
 
-        table_name = instance.__tablename__
-        record_id = getattr(instance, "id", None)
-        user_id = current_user_id.get() or getattr(session, "current_user", None)
-        ip_address = current_ip.get() or getattr(session, "client_ip", None)
+def audit_plan(mapper: Mapper) -> AuditPlan:
+    plan = _plans.get(mapper)
+    if plan is not None:
+        return plan
 
-        audit_entry = AuditLog(
+    table_name = mapper.local_table.name
+    if table_name in _excluded_tables:
+        plan = AuditPlan(table_name=table_name, enabled=False)
+    else:
+        columns = []
+        sampled = {}
+        for prop in mapper.column_attrs:
+            column = prop.columns[0]
+            qualified = f"{table_name}.{column.name}"
+            # Generated columns (e.g. *_normalized) are derived, never diffed
+            if qualified in _excluded_columns or column.computed is not None:
+                continue
+            columns.append((prop.key, column.name))
+            if qualified in _sampled_columns:
+                sampled[prop.key] = _sampled_columns[qualified]
+        plan = AuditPlan(
             table_name=table_name,
-            record_id=record_id,
-            action=action,
-            changed_data=safe_json_dumps(changes) if changes else None,
-            user_id=user_id,
-            ip_address=ip_address,
-            timestamp=datetime.utcnow(),
+            enabled=True,
+            columns=tuple(columns),
+            sampled=sampled,
         )
 
-        # Add safely — no manual conn.execute()
-        session.add(audit_entry)
+    _plans[mapper] = plan
+    return plan
+
+
+# ------------------ CHANGE CAPTURE ------------------
+# Change records are plain dicts built in after_flush and parked on the session
+# until its transaction ends; nothing is added to the unit of work.
+def _audit_record(session, plan, record_id, action, changes=None) -> Dict[str, Any]:
+    return {
+        "table_name": plan.table_name,
+        "record_id": record_id,
+        "action": action,
+        "changed_data": encode_value(changes) if changes else None,
+        "user_id": current_user_id.get() or getattr(session, "current_user", None),
+        "ip_address": current_ip.get() or getattr(session, "client_ip", None),
+        "timestamp": datetime.utcnow(),
+    }
+
+
+def _update_changes(plan, state) -> Optional[dict]:
+    changes = {}
+    for key, _ in plan.columns:
+        history = state.attrs[key].history
+        if history.has_changes():
+            old = history.deleted[0] if history.deleted else None
+            new = history.added[0] if history.added else None
+            changes[key] = {"old": old, "new": new}
+    return _sampled(plan, changes)
+
+
+def _sampled(plan, changes) -> Optional[dict]:
+    if not changes:
+        return None
+
+    # Only sampled fields changed: keep a fraction of these records
+    if plan.sampled and changes.keys() <= plan.sampled.keys():
+        if random.random() >= min(plan.sampled[key] for key in changes):
+            return None
+    return changes
+
+
+# ------------------ ACTIVITY SCOPE ------------------
+# Each record is tagged with the board (and task) it belongs to, so the activity
+# feeds can read one index range instead of joining through the board tree.
+def _scope_hint(table_name, data):
+    """(board_id, task_id, column_id) known from the row's own values."""
+    if table_name == "boards":
+        return data.get("id"), None, None
+    if table_name == "board_columns":
+        return data.get("board_id"), None, None
+    if table_name == "tasks":
+        return None, data.get("id"), data.get("column_id")
+    if table_name == "subtasks":
+        return None, data.get("task_id"), None
+    return None, None, None
 
-        print(f"[AUDIT] {action} on {table_name} (ID={record_id}) by {user_id} from {ip_address}")
 
-    except Exception as e:
-        print(f"[AUDIT ERROR] {e}")
+def _from_identity_map(session, model, pk, attribute):
+    instance = session.identity_map.get(identity_key(model, pk))
+    return inspect(instance).dict.get(attribute) if instance is not None else None
 
 
-# ------------------ SQLALCHEMY EVENT LISTENER ------------------
+def _resolve_scopes(session, scoped) -> None:
+    """
+    Fill board_id on records that only know a column or task. Uses objects already
+    in the session first; what is left costs at most one query per kind per flush.
+    """
+    unresolved = []
+    for record, column_id, task_id in scoped:
+        if record["board_id"] is not None:
+            continue
+        if column_id is None and task_id is not None:
+            column_id = _from_identity_map(session, Task, task_id, "column_id")
+        if column_id is not None:
+            record["board_id"] = _from_identity_map(session, BoardColumn, column_id, "board_id")
+        if record["board_id"] is None:
+            unresolved.append((record, column_id, task_id))
+    if not unresolved:
+        return
+
+    connection = session.connection()
+    column_ids = {column_id for _, column_id, _ in unresolved if column_id is not None}
+    task_ids = {task_id for _, column_id, task_id in unresolved if column_id is None and task_id is not None}
+    column_boards = {}
+    task_boards = {}
+    if column_ids:
+        column_boards = dict(connection.execute(
+            select(BoardColumn.id, BoardColumn.board_id).where(BoardColumn.id.in_(column_ids))
+        ).all())
+    if task_ids:
+        task_boards = dict(connection.execute(
+            select(Task.id, BoardColumn.board_id)
+            .join(BoardColumn, Task.column_id == BoardColumn.id)
+            .where(Task.id.in_(task_ids))
+        ).all())
+    for record, column_id, task_id in unresolved:
+        if column_id is not None:
+            record["board_id"] = column_boards.get(column_id)
+        else:
+            record["board_id"] = task_boards.get(task_id)
+
+
+def _collect_changes(session):
+    """Change records for everything in this flush."""
+    records = []
+    scoped = []
+
+    def add(plan, state, action, changes=None):
+        record = _audit_record(session, plan, state.dict.get("id"), action, changes)
+        board_id, task_id, column_id = _scope_hint(plan.table_name, state.dict)
+        record["board_id"], record["task_id"] = board_id, task_id
+        if board_id is not None or task_id is not None or column_id is not None:
+            scoped.append((record, column_id, task_id))
+        records.append(record)
+
+    # Handle inserts
+    for instance in session.new:
+        state = inspect(instance)
+        plan = audit_plan(state.mapper)
+        if plan.enabled:
+            add(plan, state, "CREATE", {
+                name: state.dict.get(key) for key, name in plan.columns
+            })
+
+    # Handle updates
+    for instance in session.dirty:
+        state = inspect(instance)
+        plan = audit_plan(state.mapper)
+        if plan.enabled:
+            changes = _update_changes(plan, state)
+            if changes:
+                add(plan, state, "UPDATE", changes)
+
+    # Handle deletions
+    for instance in session.deleted:
+        state = inspect(instance)
+        plan = audit_plan(state.mapper)
+        if plan.enabled:
+            add(plan, state, "DELETE")
+
+    _resolve_scopes(session, scoped)
+    return records
+
+
+def _emit(session, records) -> None:
+    if settings.AUDIT_MODE == "sync":
+        # Same transaction as the change: one multi-row INSERT per flush, in a
+        # SAVEPOINT so a failed insert is rolled back on its own instead of
+        # aborting the caller's transaction. Taken on the connection: rolling
+        # back a Session savepoint would expire the objects just flushed.
+        connection = session.connection()
+        with connection.begin_nested():
+            connection.execute(insert(AuditLog.__table__), records)
+    else:
+        session.info.setdefault("audit_pending", []).extend(records)
+
+
+# ------------------ BACKGROUND WRITER ------------------
+# Queued by AuditWriter.stop behind everything submitted so far
+_STOP = object()
+
+
+class AuditWriter:
+    """
+    Bounded in-process queue of committed change records, drained by one
+    background task that writes them with multi-row INSERTs of up to
+    AUDIT_BATCH_SIZE rows, at least every AUDIT_FLUSH_INTERVAL_SECONDS.
+    """
+
+    def __init__(self, max_size: int, batch_size: int, flush_interval: float) -> None:
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failed = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Write what is still queued, then stop the background task. The task is
+        told to stop with a sentinel rather than cancelled: a cancel can land
+        while it holds a dequeued batch (or mid-INSERT) and lose those rows.
+        """
+        if self._task is None:
+            return
+        await self._queue.put((time.monotonic(), _STOP))
+        await self._task
+        self._task = None
+        # Records submitted behind the sentinel; later ones count as dropped
+        while not self._queue.empty():
+            await self._write(self._take(self.batch_size))
+        self._queue = None
+
+    def submit(self, records) -> None:
+        """Called after commit; never blocks the request. Drops (and counts) on overflow."""
+        if self._queue is None:
+            self.dropped += len(records)
+            return
+        now = time.monotonic()
+        for record in records:
+            try:
+                self._queue.put_nowait((now, record))
+                self.enqueued += 1
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+    def _take(self, limit: int) -> list:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1][1] is not _STOP:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+                batch.extend(self._take(self.batch_size - len(batch)))
+            stopping = any(record is _STOP for _, record in batch)
+            await self._write([item for item in batch if item[1] is not _STOP])
+            if stopping:
+                return
+
+    async def _write(self, batch) -> None:
+        if not batch:
+            return
+        rows = [record for _, record in batch]
+        try:
+            async with db_instance.db_connection() as session:
+                await session.execute(insert(AuditLog.__table__), rows)
+        except Exception:
+            # One bad row (e.g. a user deleted meanwhile) must not lose the batch
+            logger.exception("Audit batch of %d rows failed, retrying row by row", len(rows))
+            for row in rows:
+                try:
+                    async with db_instance.db_connection() as session:
+                        await session.execute(insert(AuditLog.__table__), [row])
+                except Exception:
+                    self.failed += 1
+                else:
+                    self.written += 1
+        else:
+            self.written += len(rows)
+        self.batches += 1
+        self.last_lag = time.monotonic() - batch[0][0]
+        self.max_lag = max(self.max_lag, self.last_lag)
+
+    def stats(self) -> dict:
+        return {
+            "mode": settings.AUDIT_MODE,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_max_size": self.max_size,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "lag_ms": {
+                "last": round(self.last_lag * 1000, 2),
+                "max": round(self.max_lag * 1000, 2),
+            },
+        }
+
+
+audit_writer = AuditWriter(
+    max_size=settings.AUDIT_QUEUE_MAX_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+)
+
+
+# ------------------ SQLALCHEMY EVENT LISTENERS ------------------
 @event.listens_for(Session, "after_flush")
 def receive_after_flush(session, flush_context):
     """Global listener for CREATE, UPDATE, DELETE events."""
     try:
-        # Handle inserts
-        for instance in session.new:
-            if isinstance(instance, AuditLog) or instance.__tablename__ in {"audit_logs", "audit_logs_new"}:
-                continue
-            add_audit_log(session, instance, "CREATE", {
-                c.name: getattr(instance, c.name) for c in instance.__table__.columns
-            })
+        records = _collect_changes(session)
+        if records:
+            _emit(session, records)
+    except Exception:
+        # The change itself stands; losing its audit row must not fail the request
+        logger.exception("Audit capture failed in after_flush")
 
-        # Handle updates
-        for instance in session.dirty:
-            if isinstance(instance, AuditLog) or instance.__tablename__ in {"audit_logs", "audit_logs_new"}:
-                continue
-            state = inspect(instance)
-            changes = {}
-            for attr in state.attrs:
-                if attr.history.has_changes():
-                    old = attr.history.deleted[0] if attr.history.deleted else None
-                    new = attr.history.added[0] if attr.history.added else None
-                    changes[attr.key] = {"old": old, "new": new}
-            if changes:
-                add_audit_log(session, instance, "UPDATE", changes)
 
-        # Handle deletions
-        for instance in session.deleted:
-            if isinstance(instance, AuditLog) or instance.__tablename__ in {"audit_logs", "audit_logs_new"}:
-                continue
-            add_audit_log(session, instance, "DELETE")
+@event.listens_for(Session, "after_transaction_create")
+def receive_after_transaction_create(session, transaction):
+    # Remember how many records predate a SAVEPOINT so its rollback can drop the rest
+    if transaction.nested:
+        session.info.setdefault("audit_marks", {})[transaction] = len(
+            session.info.get("audit_pending", [])
+        )
+
+
+@event.listens_for(Session, "after_transaction_end")
+def receive_after_transaction_end(session, transaction):
+    marks = session.info.get("audit_marks")
+    if marks:
+        marks.pop(transaction, None)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def receive_after_soft_rollback(session, previous_transaction):
+    pending = session.info.get("audit_pending")
+    if not pending:
+        return
+    mark = session.info.get("audit_marks", {}).get(previous_transaction)
+    if previous_transaction.nested and mark is not None:
+        del pending[mark:]
+    elif not previous_transaction.nested:
+        session.info.pop("audit_pending", None)
+
 
-    except Exception as e:
-        print(f"[AUDIT ERROR in after_flush] {e}")
\ No newline at end of file
+@event.listens_for(Session, "after_commit")
+def receive_after_commit(session):
+    records = session.info.pop("audit_pending", None)
+    if records:
+        audit_writer.submit(records)
@@ -0,0 +1,259 @@
+import asyncio
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.db import db_instance
+
+# ---------------------------
+# Audit table partitioning
+# ---------------------------
+# audit_logs and login_audit_logs are RANGE-partitioned by month on timestamp.
+# Partitions are named <table>_YYYY_MM; <table>_default catches rows for months
+# that have no partition yet, so inserts never fail if maintenance falls behind.
+PARTITIONED_TABLES = ("audit_logs", "login_audit_logs")
+
+# pg_try_advisory_xact_lock key; only one worker runs maintenance at a time
+AUDIT_MAINTENANCE_LOCK = 7302
+
+_maintenance_task: Optional[asyncio.Task] = None
+
+
+def _month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_name(table: str, month: date) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def _partition_month(table: str, name: str) -> Optional[date]:
+    suffix = name[len(table) + 1:]
+    try:
+        return datetime.strptime(suffix, "%Y_%m").date()
+    except ValueError:
+        return None  # the default partition
+
+
+def _retention_months(table: str) -> int:
+    if table == "login_audit_logs":
+        return settings.LOGIN_AUDIT_RETENTION_MONTHS
+    return settings.AUDIT_RETENTION_MONTHS
+
+
+async def _try_lock(session: AsyncSession) -> bool:
+    return await session.scalar(
+        text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": AUDIT_MAINTENANCE_LOCK}
+    )
+
+
+async def _partitions(session: AsyncSession, table: str) -> dict[str, date]:
+    result = await session.execute(
+        text(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :table
+            """
+        ),
+        {"table": table},
+    )
+    partitions = {}
+    for (name,) in result.all():
+        month = _partition_month(table, name)
+        if month is not None:
+            partitions[name] = month
+    return partitions
+
+
+async def _create_partition(session: AsyncSession, table: str, name: str, month: date) -> int:
+    """
+    Create one month's partition and return how many rows it took over from
+    the default partition. PostgreSQL refuses to create a partition while the
+    default holds rows for its range, so in that case the default is detached,
+    the month created, its rows moved across, and the default re-attached.
+    """
+    bounds = {"start": month, "end": _add_months(month, 1)}
+    create = text(
+        f"CREATE TABLE {name} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+    )
+    stranded = await session.scalar(
+        text(
+            f"SELECT EXISTS (SELECT 1 FROM {table}_default "
+            f"WHERE timestamp >= :start AND timestamp < :end)"
+        ),
+        bounds,
+    )
+    if not stranded:
+        await session.execute(create)
+        return 0
+
+    await session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {table}_default"))
+    await session.execute(create)
+    result = await session.execute(
+        text(
+            f"""
+            WITH moved AS (
+                DELETE FROM {table}_default
+                WHERE timestamp >= :start AND timestamp < :end
+                RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+            """
+        ),
+        bounds,
+    )
+    await session.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {table}_default DEFAULT"))
+    return result.rowcount
+
+
+# ---------------------------
+# Maintenance steps
+# ---------------------------
+async def ensure_partitions(session: AsyncSession, today: date) -> tuple[list[str], dict[str, int]]:
+    """
+    Create this month's and the next AUDIT_PARTITIONS_AHEAD months' partitions.
+    Returns the partitions created and, for those that took over rows from the
+    default partition, how many rows were moved.
+    """
+    created = []
+    moved = {}
+    current = _month_start(today)
+    for table in PARTITIONED_TABLES:
+        await session.execute(
+            text(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT")
+        )
+        existing = await _partitions(session, table)
+        for offset in range(settings.AUDIT_PARTITIONS_AHEAD + 1):
+            month = _add_months(current, offset)
+            name = _partition_name(table, month)
+            if name in existing:
+                continue
+            rows = await _create_partition(session, table, name, month)
+            created.append(name)
+            if rows:
+                moved[name] = rows
+    return created, moved
+
+
+async def compact_partition(session: AsyncSession, name: str, month: date) -> int:
+    """Roll one audit_logs month into per-record rows of audit_log_summaries."""
+    result = await session.execute(
+        text(
+            f"""
+            INSERT INTO audit_log_summaries
+                (table_name, record_id, month, creates, updates, deletes,
+                 first_at, last_at, last_user_id)
+            SELECT
+                table_name,
+                record_id,
+                :month,
+                count(*) FILTER (WHERE action = 'CREATE'),
+                count(*) FILTER (WHERE action = 'UPDATE'),
+                count(*) FILTER (WHERE action = 'DELETE'),
+                min(timestamp),
+                max(timestamp),
+                (array_agg(user_id ORDER BY timestamp DESC))[1]
+            FROM {name}
+            GROUP BY table_name, record_id
+            ON CONFLICT (table_name, record_id, month) DO UPDATE SET
+                creates = audit_log_summaries.creates + EXCLUDED.creates,
+                updates = audit_log_summaries.updates + EXCLUDED.updates,
+                deletes = audit_log_summaries.deletes + EXCLUDED.deletes,
+                first_at = least(audit_log_summaries.first_at, EXCLUDED.first_at),
+                last_at = greatest(audit_log_summaries.last_at, EXCLUDED.last_at),
+                last_user_id = EXCLUDED.last_user_id
+            """
+        ),
+        {"month": month},
+    )
+    return result.rowcount
+
+
+async def drop_partition(session: AsyncSession, table: str, name: str) -> None:
+    """Retention: detach and drop a whole month; no row-by-row DELETE, no vacuum debt."""
+    await session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+    await session.execute(text(f"DROP TABLE {name}"))
+
+
+async def run_audit_maintenance(today: Optional[date] = None) -> dict:
+    """
+    Create upcoming partitions, then expire months past retention: audit_logs
+    months are compacted into summaries first (AUDIT_COMPACT_ON_RETENTION).
+    Every partition is handled in its own short transaction.
+    """
+    today = today or datetime.utcnow().date()
+    report = {"created": [], "moved": {}, "compacted": [], "dropped": [], "summaries_deleted": 0}
+
+    async with db_instance.db_connection() as session:
+        if not await _try_lock(session):
+            return report
+        report["created"], report["moved"] = await ensure_partitions(session, today)
+        expiring = {
+            table: {
+                name: month
+                for name, month in (await _partitions(session, table)).items()
+                if month < _add_months(_month_start(today), -_retention_months(table))
+            }
+            for table in PARTITIONED_TABLES
+        }
+
+    for table, partitions in expiring.items():
+        for name, month in sorted(partitions.items(), key=lambda item: item[1]):
+            async with db_instance.db_connection() as session:
+                if not await _try_lock(session):
+                    return report
+                if table == "audit_logs" and settings.AUDIT_COMPACT_ON_RETENTION:
+                    await compact_partition(session, name, month)
+                    report["compacted"].append(name)
+                await drop_partition(session, table, name)
+                report["dropped"].append(name)
+
+    if settings.AUDIT_SUMMARY_RETENTION_MONTHS:
+        cutoff = _add_months(_month_start(today), -settings.AUDIT_SUMMARY_RETENTION_MONTHS)
+        async with db_instance.db_connection() as session:
+            result = await session.execute(
+                text("DELETE FROM audit_log_summaries WHERE month < :cutoff"), {"cutoff": cutoff}
+            )
+            report["summaries_deleted"] = result.rowcount
+
+    return report
+
+
+# ---------------------------
+# Background loop
+# ---------------------------
+async def _maintenance_loop() -> None:
+    while True:
+        try:
+            report = await run_audit_maintenance()
+            print(f"[AUDIT] Maintenance: {report}")
+        except Exception as e:
+            print(f"[AUDIT ERROR] Maintenance failed: {e}")
+        await asyncio.sleep(settings.AUDIT_MAINTENANCE_INTERVAL_SECONDS)
+
+
+def start_audit_maintenance() -> None:
+    global _maintenance_task
+    if _maintenance_task is None:
+        _maintenance_task = asyncio.create_task(_maintenance_loop())
+
+
+async def stop_audit_maintenance() -> None:
+    global _maintenance_task
+    if _maintenance_task is not None:
+        _maintenance_task.cancel()
+        try:
+            await _maintenance_task
+        except asyncio.CancelledError:
+            pass
+        _maintenance_task = None
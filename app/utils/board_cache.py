@@ -0,0 +1,106 @@
+from collections import OrderedDict
+from typing import Any, Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.tasks import Board, BoardColumn, Task
+from app.core.config import settings
+
+
+# ---------------------------
+# Board snapshot cache
+# ---------------------------
+class BoardSnapshotCache:
+    """
+    In-process LRU cache of serialized board views.
+
+    Entries are keyed by (view, board_id) and tagged with the board version
+    they were built from. A lookup only hits when the cached version matches
+    the version currently stored on the board row, so any write that bumps
+    the version makes the old snapshot unreachable.
+    Cached payloads are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple[str, int], tuple[int, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, view: str, board_id: int, version: int) -> Optional[Any]:
+        key = (view, board_id)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, view: str, board_id: int, version: int, payload: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        key = (view, board_id)
+        self._entries[key] = (version, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def evict_board(self, board_id: int) -> None:
+        for key in [key for key in self._entries if key[1] == board_id]:
+            del self._entries[key]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+board_cache = BoardSnapshotCache(settings.BOARD_CACHE_MAX_ENTRIES)
+
+
+# ---------------------------
+# Version bumping
+# ---------------------------
+async def bump_board_version(
+    db: AsyncSession,
+    board_id: int = None,
+    column_id: int = None,
+    task_id: int = None,
+):
+    """
+    Increment the version of the board that owns the given board, column or task.
+    Runs inside the caller's transaction, so the bump commits with the write.
+    """
+    if board_id is not None:
+        target = board_id
+    elif column_id is not None:
+        target = (
+            select(BoardColumn.board_id)
+            .where(BoardColumn.id == column_id)
+            .scalar_subquery()
+        )
+    else:
+        target = (
+            select(BoardColumn.board_id)
+            .join(Task, Task.column_id == BoardColumn.id)
+            .where(Task.id == task_id)
+            .scalar_subquery()
+        )
+
+    await db.execute(
+        update(Board)
+        .where(Board.id == target)
+        .values(version=Board.version + 1)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,95 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from app.core.config import settings
+
+
+# ---------------------------
+# Authenticated principal
+# ---------------------------
+@dataclass(frozen=True)
+class AuthPrincipal:
+    """The slice of AuthUser the request path needs; passed to services as current_user."""
+    id: int
+    email: str
+    is_active: bool
+    token_version: int
+    generation: int
+
+
+# ---------------------------
+# Identity cache
+# ---------------------------
+class IdentityCache:
+    """
+    Bounded TTL/LRU cache of active-user principals keyed by user id.
+
+    Writers call invalidate() after committing a change to the user. Each
+    principal carries the generation (invalidation epoch) its load started at.
+    A load that started before the user's last invalidation is not stored, so
+    a slow reader cannot put stale data back into the cache. Other workers
+    pick up the change when their entry's TTL runs out.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, tuple[float, AuthPrincipal]]" = OrderedDict()
+        self._epoch = 0
+        self._invalidated: "OrderedDict[int, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def generation(self) -> int:
+        """Take this before loading a user and pass it into the principal."""
+        return self._epoch
+
+    def get(self, user_id: int) -> Optional[AuthPrincipal]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, principal: AuthPrincipal) -> None:
+        if self.max_entries <= 0:
+            return
+        if principal.generation < self._invalidated.get(principal.id, 0):
+            return
+        self._entries[principal.id] = (time.monotonic() + self.ttl_seconds, principal)
+        self._entries.move_to_end(principal.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+        self._epoch += 1
+        self._invalidated[user_id] = self._epoch
+        self._invalidated.move_to_end(user_id)
+        # Old markers only matter to loads that finished long ago
+        while len(self._invalidated) > self.max_entries:
+            self._invalidated.popitem(last=False)
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+identity_cache = IdentityCache(
+    max_entries=settings.IDENTITY_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.IDENTITY_CACHE_TTL_SECONDS,
+)
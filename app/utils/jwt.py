@@ -8,9 +8,12 @@ from jose import jwt, JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from contextlib import asynccontextmanager
-from app.core.db import get_db
-from app.models.users import AuthUser,RevokedToken
+from app.core.db import db_instance, get_read_db, mark_last_write
+from app.models.users import AuthUser
 from app.core.config import settings
+from app.utils.revocation import revoked_tokens
+from app.utils.identity_cache import AuthPrincipal, identity_cache
+from app.utils.audit import current_user_id, current_ip
 
 # ---------------------------
 # JWT Configuration
@@ -18,7 +21,7 @@ from app.core.config import settings
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
-REFRESH_TOKEN_EXPIRE_DAYS = 7
+REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
 
 PUBLIC_URLS: List[str] = [
    "/api/v1/user/create",
@@ -30,6 +33,8 @@ PUBLIC_URLS: List[str] = [
     "/openapi.json",
 ]
 
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login-swagger")
 
 
@@ -122,11 +127,87 @@ def decode_jwt(token: str) -> Optional[Dict]:
 # Async generator wrapper for middleware
 # ---------------------------
 @asynccontextmanager
-async def get_db_session():
-    async for session in get_db():
+async def get_db_session(request: Request):
+    async for session in get_read_db(request):
         yield session
 
 
+# ---------------------------
+# Token authentication
+# ---------------------------
+class AuthError(Exception):
+    def __init__(self, message: str):
+        self.message = message
+
+
+async def load_principal(db: AsyncSession, user_id: int) -> Optional[AuthPrincipal]:
+    principal = identity_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    generation = identity_cache.generation()
+    result = await db.execute(
+        select(AuthUser.id, AuthUser.email, AuthUser.is_active, AuthUser.token_version)
+        .where(AuthUser.id == user_id)
+    )
+    row = result.first()
+    if not row:
+        return None
+
+    principal = AuthPrincipal(
+        id=row.id,
+        email=row.email,
+        is_active=row.is_active,
+        token_version=row.token_version,
+        generation=generation,
+    )
+    identity_cache.put(principal)
+    return principal
+
+
+async def load_token_principal(db: AsyncSession, payload: Dict) -> AuthPrincipal:
+    """
+    Load the token's user and check its "ver" claim against token_version.
+    Tokens issued before the last password reset are rejected; other workers
+    notice the bump once their identity cache entry expires. Raises AuthError.
+    """
+    user_id = int(payload.get("sub"))
+    user = await load_principal(db, user_id)
+    token_version = payload.get("ver", 0)
+    if user is None or token_version > user.token_version:
+        # The cache or the replica `db` reads from has not caught up with a
+        # new user or a bump yet; the primary is authoritative
+        identity_cache.invalidate(user_id)
+        async with db_instance.db_connection() as primary:
+            user = await load_principal(primary, user_id)
+    if not user:
+        raise AuthError("User not found or inactive")
+    if token_version != user.token_version:
+        raise AuthError("Token has been revoked")
+    return user
+
+
+async def authenticate_token(db: AsyncSession, token: str) -> tuple[AuthPrincipal, Dict]:
+    """
+    Decode the token, check revocation and load the active user.
+    Shared by the middleware and the endpoint dependency; raises AuthError.
+    """
+    payload = decode_jwt(token)
+    if not payload:
+        raise AuthError("Invalid or expired token")
+
+    # 🔹 Check if token is revoked
+    if await revoked_tokens.is_revoked(db, payload.get("jti"), payload.get("iat")):
+        raise AuthError("Token has been revoked")
+
+    # 🔹 Fetch the current user
+    user = await load_token_principal(db, payload)
+    if not user.is_active:
+        raise AuthError("User not found or inactive")
+
+    return user, payload
+
+
 # ---------------------------
 # JWT Middleware
 # ---------------------------
@@ -145,42 +226,19 @@ async def jwt_middleware(request: Request, call_next):
         )
 
     token = auth_header.split(" ")[1]
-    payload = decode_jwt(token)
-    if not payload:
+
+    try:
+        async with get_db_session(request) as db:
+            user, payload = await authenticate_token(db, token)
+
+    except AuthError as e:
         return standard_response(
             success=False,
-            message="Invalid or expired token",
+            message=e.message,
             error="Unauthorized",
             status_code=status.HTTP_401_UNAUTHORIZED
         )
 
-    jti = payload.get("jti")
-    user_id = payload.get("sub")
-
-    try:
-        async with get_db_session() as db:
-            # Check revoked token
-            result = await db.execute(select(RevokedToken).where(RevokedToken.jti == jti))
-            revoked = result.scalars().first()
-            if revoked:
-                return standard_response(
-                    success=False,
-                    message="Token has been revoked",
-                    error="Unauthorized",
-                    status_code=status.HTTP_401_UNAUTHORIZED
-                )
-
-            # Fetch user
-            result = await db.execute(select(AuthUser).where(AuthUser.id == int(user_id)))
-            user = result.scalars().first()
-            if not user or not user.is_active:
-                return standard_response(
-                    success=False,
-                    message="User not found or inactive",
-                    error="Unauthorized",
-                    status_code=status.HTTP_401_UNAUTHORIZED
-                )
-
     except Exception as e:
         return standard_response(
             success=False,
@@ -189,50 +247,46 @@ async def jwt_middleware(request: Request, call_next):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
-    # Attach user info to request.state
+    # Attach user info to request.state; get_current_user reuses it
     request.state.user = {
         "id": user.id,
         "email": user.email,
-        "db_user": user
+        "jti": payload.get("jti"),
+        "token": token,
+        "principal": user
     }
+    # Attribute audit records written while handling this request
+    current_user_id.set(user.id)
+    current_ip.set(request.client.host if request.client else None)
+
+    response = await call_next(request)
+
+    # Keep this client's reads on the primary while the replica catches up
+    if request.method not in READ_METHODS and response.status_code < 400:
+        mark_last_write(response)
 
-    return await call_next(request)
+    return response
 
 
 # ---------------------------
 # Dependency for endpoints
 # ---------------------------
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> AuthUser:
-    payload = decode_jwt(token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-        )
-
-    jti = payload.get("jti")
+    db: AsyncSession = Depends(get_read_db),
+) -> AuthPrincipal:
+    # 🔹 Already authenticated by jwt_middleware for this request
+    auth = getattr(request.state, "user", None)
+    if auth and auth["token"] == token:
+        return auth["principal"]
 
-    # 🔹 Check if token is revoked
-    result = await db.execute(select(RevokedToken).where(RevokedToken.jti == jti))
-    revoked = result.scalars().first()
-    if revoked:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has been revoked",
-        )
-
-    # 🔹 Fetch the current user
-    user_id = payload.get("sub")
-    result = await db.execute(select(AuthUser).where(AuthUser.id == int(user_id)))
-    user = result.scalars().first()
-
-    if not user or not user.is_active:
+    try:
+        user, _ = await authenticate_token(db, token)
+    except AuthError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found or inactive",
+            detail=e.message,
         )
 
     return user
@@ -0,0 +1,90 @@
+from typing import Optional
+
+# ---------------------------
+# Lexicographic rank keys
+# ---------------------------
+# Task order is the plain string order of these keys (digits < upper < lower
+# in ASCII), so moving a task only rewrites that task's key.
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+_INDEX = {digit: value for value, digit in enumerate(DIGITS)}
+
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    """
+    Return a key that sorts strictly between `before` and `after`.
+    None means an open end (start or end of the column).
+    """
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"rank {before!r} must sort before {after!r}")
+    if before is None and after is None:
+        return DIGITS[BASE // 2]
+    if after is None:
+        return rank_after(before)
+    if before is None:
+        return rank_before(after)
+    return _midpoint(before, after)
+
+
+def rank_after(before: str) -> str:
+    """Key for appending after the last key: bump the last digit that has room."""
+    for i in range(len(before) - 1, -1, -1):
+        value = _INDEX[before[i]]
+        if value < BASE - 1:
+            return before[:i] + DIGITS[value + 1]
+    return before + DIGITS[1]
+
+
+def rank_before(after: str) -> str:
+    """Key for prepending before the first key."""
+    for i in range(len(after) - 1, -1, -1):
+        value = _INDEX[after[i]]
+        if value > 1:
+            return after[:i] + DIGITS[value - 1]
+    return _midpoint("", after)
+
+
+def evenly_spaced_ranks(count: int) -> list[str]:
+    """
+    Fresh, equal-length keys for `count` items, used by the rebalancer.
+    Keys fill the lower half of the key space and leave at least BASE
+    values between neighbours, so later moves and appends stay short.
+    """
+    if count <= 0:
+        return []
+    length = 1
+    while BASE ** length < 2 * (count + 1) * BASE:
+        length += 1
+    step = BASE ** length // (2 * (count + 1))
+    return [_encode((i + 1) * step, length) for i in range(count)]
+
+
+def _encode(value: int, length: int) -> str:
+    digits = []
+    for _ in range(length):
+        value, remainder = divmod(value, BASE)
+        digits.append(DIGITS[remainder])
+    return "".join(reversed(digits))
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    # Walk both keys digit by digit; a missing digit in `a` counts as 0 and
+    # an open `b` as BASE, so the result never ends in a trailing zero.
+    prefix = []
+    i = 0
+    while True:
+        digit_a = _INDEX[a[i]] if i < len(a) else 0
+        digit_b = _INDEX[b[i]] if b is not None and i < len(b) else BASE
+        if digit_a == digit_b:
+            prefix.append(DIGITS[digit_a])
+            i += 1
+            continue
+
+        mid = (digit_a + digit_b) // 2
+        if mid > digit_a:
+            prefix.append(DIGITS[mid])
+            return "".join(prefix)
+
+        # Adjacent digits: keep a's digit and look for room after the rest of a
+        prefix.append(DIGITS[digit_a])
+        a, b, i = a[i + 1:], None, 0
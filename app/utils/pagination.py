@@ -0,0 +1,52 @@
+import base64
+import json
+from typing import Optional
+from fastapi import status
+from app.core.response import AppException
+
+
+# ---------------------------
+# Opaque keyset cursors
+# ---------------------------
+# A cursor is the urlsafe-base64 JSON of the last row's immutable key (plus its
+# 1-based position, so numbering continues on the next page). Sort values that
+# can change under a client, like a task's rank, are looked up from that key
+# at query time rather than embedded. Clients must treat it as an opaque
+# string and only pass it back.
+def encode_cursor(**key) -> str:
+    raw = json.dumps(key, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _is_a(value, expected: type) -> bool:
+    # JSON booleans decode to bool, a subclass of int; they are never a valid key
+    return isinstance(value, expected) and not isinstance(value, bool)
+
+
+def decode_cursor(cursor: Optional[str], **fields: type) -> Optional[dict]:
+    """
+    Decode a cursor and check it carries each of `fields` with the given type
+    (e.g. id=int, position=int); raises a 400 AppException otherwise, so a tampered
+    cursor never reaches the query.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(key, dict) or not all(
+            _is_a(key.get(field), expected) for field, expected in fields.items()
+        ):
+            raise ValueError(cursor)
+        return key
+    except ValueError:
+        raise AppException(
+            message="Invalid pagination cursor",
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+
+
+def page_size(limit: Optional[int], default: int, maximum: int) -> int:
+    if limit is None:
+        return default
+    return max(1, min(limit, maximum))
@@ -0,0 +1,149 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.users import RevokedToken
+from app.core.config import settings
+
+
+# ---------------------------
+# Revoked token cache
+# ---------------------------
+class RevokedTokenCache:
+    """
+    In-process mirror of the recently revoked JTIs.
+
+    Only tokens revoked within the longest token lifetime are kept; anything
+    older has expired and is rejected by decode_jwt anyway, which bounds memory.
+    Each worker re-reads rows newer than its watermark at most once every
+    `refresh_seconds`, so a logout handled by another worker is honoured
+    after that delay. Logouts handled by this worker are applied immediately.
+
+    The set never holds more than `max_entries`: past the bound the entries
+    that expire soonest (oldest revoked_at) are evicted and the newest evicted
+    revoked_at is remembered. A token issued after that point cannot be among
+    the evicted ones, so the cache still answers for it; only lookups for
+    older tokens fall back to the database.
+    """
+
+    def __init__(self, max_entries: int, refresh_seconds: int, retention: timedelta) -> None:
+        self.max_entries = max_entries
+        self.refresh_seconds = refresh_seconds
+        self.retention = retention
+        self._revoked: dict[str, datetime] = {}
+        self._watermark: Optional[datetime] = None
+        self._evicted_through: Optional[datetime] = None
+        self._last_refresh: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.evictions = 0
+
+    def add(self, jti: str, revoked_at: Optional[datetime] = None) -> None:
+        self._revoked[jti] = revoked_at or datetime.utcnow()
+        self._evict_overflow()
+
+    async def is_revoked(self, db: AsyncSession, jti: str, issued_at: Optional[int] = None) -> bool:
+        """`issued_at` is the token's iat claim; without it, evictions force a database check."""
+        await self._refresh_if_stale(db)
+
+        if jti in self._revoked:
+            self.hits += 1
+            return True
+        if self._evicted_through is None or (
+            issued_at is not None and datetime.utcfromtimestamp(issued_at) > self._evicted_through
+        ):
+            self.hits += 1
+            return False
+
+        self.misses += 1
+        result = await db.execute(select(RevokedToken.jti).where(RevokedToken.jti == jti))
+        return result.first() is not None
+
+    def _evict_overflow(self) -> None:
+        if len(self._revoked) <= self.max_entries:
+            return
+        # Trim to 90% so a steady stream of logouts does not sort on every add
+        keep = self.max_entries * 9 // 10
+        by_age = sorted(self._revoked.items(), key=lambda item: item[1])
+        evicted = by_age[:len(by_age) - keep]
+        for jti, _ in evicted:
+            del self._revoked[jti]
+        newest_evicted = evicted[-1][1]
+        if self._evicted_through is None or newest_evicted > self._evicted_through:
+            self._evicted_through = newest_evicted
+        self.evictions += len(evicted)
+
+    async def _refresh_if_stale(self, db: AsyncSession) -> None:
+        if not self._is_stale():
+            return
+
+        async with self._lock:
+            if not self._is_stale():
+                return
+
+            now = datetime.utcnow()
+            cutoff = now - self.retention
+            if self._watermark is None:
+                since = cutoff
+            else:
+                # Overlap by one interval (clock skew between workers) plus the
+                # replica lag budget, in case `db` reads from the replica
+                since = self._watermark - timedelta(
+                    seconds=self.refresh_seconds + settings.READ_YOUR_WRITES_SECONDS
+                )
+
+            # Newest first and capped: if more than the bound arrive, the ones
+            # left unread are older than every evicted entry
+            result = await db.execute(
+                select(RevokedToken.jti, RevokedToken.revoked_at)
+                .where(RevokedToken.revoked_at >= since)
+                .order_by(RevokedToken.revoked_at.desc())
+                .limit(self.max_entries + 1)
+            )
+            for jti, revoked_at in result.all():
+                self._revoked[jti] = revoked_at
+                if self._watermark is None or revoked_at > self._watermark:
+                    self._watermark = revoked_at
+            if self._watermark is None:
+                self._watermark = since
+            self._evict_overflow()
+
+            # Drop entries whose tokens can no longer be presented
+            for jti in [jti for jti, revoked_at in self._revoked.items() if revoked_at < cutoff]:
+                del self._revoked[jti]
+            if self._evicted_through is not None and self._evicted_through < cutoff:
+                self._evicted_through = None
+
+            self._last_refresh = time.monotonic()
+            self.refreshes += 1
+
+    def _is_stale(self) -> bool:
+        return (
+            self._last_refresh is None
+            or time.monotonic() - self._last_refresh >= self.refresh_seconds
+        )
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._revoked),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "evicted_through": self._evicted_through.isoformat() if self._evicted_through else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+        }
+
+
+revoked_tokens = RevokedTokenCache(
+    max_entries=settings.REVOKED_TOKEN_CACHE_MAX_ENTRIES,
+    refresh_seconds=settings.REVOKED_TOKEN_REFRESH_SECONDS,
+    retention=max(
+        timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    ),
+)
@@ -0,0 +1,61 @@
+"""replace tasks.position with lexicographic tasks.rank
+
+Revision ID: 2a9f4c7e1d38
+Revises: 3f6a1c2d9b10
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.lexorank import evenly_spaced_ranks
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2a9f4c7e1d38'
+down_revision: Union[str, Sequence[str], None] = '3f6a1c2d9b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('rank', sa.String(255), nullable=True))
+
+    # Evenly spaced keys per column, in the old position order (ties by id)
+    rows = op.get_bind().execute(
+        sa.text("SELECT id, column_id FROM tasks ORDER BY column_id, position, id")
+    ).all()
+    by_column: dict = {}
+    for task_id, column_id in rows:
+        by_column.setdefault(column_id, []).append(task_id)
+    params = []
+    for task_ids in by_column.values():
+        ranks = evenly_spaced_ranks(len(task_ids))
+        params.extend({"id": task_id, "rank": rank} for task_id, rank in zip(task_ids, ranks))
+    if params:
+        op.get_bind().execute(sa.text("UPDATE tasks SET rank = :rank WHERE id = :id"), params)
+
+    op.alter_column('tasks', 'rank', existing_type=sa.String(255), nullable=False)
+    op.drop_column('tasks', 'position')
+    op.create_index('ix_tasks_column_rank', 'tasks', ['column_id', 'rank', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('tasks', sa.Column('position', sa.Integer(), nullable=True))
+    op.execute(
+        """
+        UPDATE tasks SET position = ordered.position
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY column_id ORDER BY rank, id) AS position
+            FROM tasks
+        ) AS ordered
+        WHERE tasks.id = ordered.id
+        """
+    )
+    op.alter_column('tasks', 'position', existing_type=sa.Integer(), nullable=False)
+    op.drop_index('ix_tasks_column_rank', table_name='tasks')
+    op.drop_column('tasks', 'rank')
@@ -0,0 +1,32 @@
+"""add boards.version
+
+Revision ID: 5d0e7b3a9c14
+Revises: c41d9a6e5f27
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d0e7b3a9c14'
+down_revision: Union[str, Sequence[str], None] = 'c41d9a6e5f27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Snapshot caches start empty, so every existing board can start at 0
+    op.add_column(
+        'boards',
+        sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('boards', 'version')
@@ -0,0 +1,39 @@
+"""sort tasks.rank by byte order (collation "C")
+
+Revision ID: 8b2e4f71c0a3
+Revises: 2a9f4c7e1d38
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4f71c0a3'
+down_revision: Union[str, Sequence[str], None] = '2a9f4c7e1d38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rewrites the column and rebuilds ix_tasks_column_rank under the new collation
+    op.alter_column(
+        'tasks', 'rank',
+        type_=sa.String(255, collation='C'),
+        existing_type=sa.String(255),
+        existing_nullable=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column(
+        'tasks', 'rank',
+        type_=sa.String(255, collation='default'),
+        existing_type=sa.String(255, collation='C'),
+        existing_nullable=False,
+    )
@@ -0,0 +1,46 @@
+"""audit_logs.changed_data to jsonb
+
+Revision ID: 9a4d2c6b1e85
+Revises: e7c3a1f84b62
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4d2c6b1e85'
+down_revision: Union[str, Sequence[str], None] = 'e7c3a1f84b62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The old listener stored json.dumps(payload) in a json column, so existing
+    # rows hold a JSON *string* of the payload: unwrap those into objects while
+    # the column is rewritten (one table rewrite, no separate backfill pass)
+    op.execute(
+        """
+        ALTER TABLE audit_logs
+        ALTER COLUMN changed_data TYPE jsonb
+        USING CASE
+            WHEN json_typeof(changed_data) = 'string' THEN (changed_data #>> '{}')::jsonb
+            ELSE changed_data::jsonb
+        END
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Back to the string-wrapped payloads the old listener reads
+    op.execute(
+        """
+        ALTER TABLE audit_logs
+        ALTER COLUMN changed_data TYPE json
+        USING to_json(changed_data::text)
+        """
+    )
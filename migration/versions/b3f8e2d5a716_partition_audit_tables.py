@@ -0,0 +1,157 @@
+"""partition audit_logs and login_audit_logs by month, add audit_log_summaries
+
+Revision ID: b3f8e2d5a716
+Revises: 9a4d2c6b1e85
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f8e2d5a716'
+down_revision: Union[str, Sequence[str], None] = '9a4d2c6b1e85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Copied column by column, in this order, between the plain and partitioned tables
+COLUMNS = {
+    'audit_logs': ['id', 'table_name', 'record_id', 'action', 'changed_data', 'user_id', 'ip_address', 'timestamp'],
+    'login_audit_logs': ['id', 'user_id', 'action', 'status', 'ip_address', 'user_agent', 'message', 'timestamp'],
+}
+
+
+def _columns(table: str) -> list:
+    # Everything but id and timestamp, whose definition depends on the layout
+    if table == 'audit_logs':
+        return [
+            sa.Column('table_name', sa.String(), nullable=False),
+            sa.Column('record_id', sa.Integer(), nullable=True),
+            sa.Column('action', sa.String(), nullable=False),
+            sa.Column('changed_data', postgresql.JSONB(), nullable=True),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('ip_address', sa.String(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['auth_user.id'], ondelete='SET NULL'),
+        ]
+    return [
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('action', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('ip_address', sa.String(length=45), nullable=True),
+        sa.Column('user_agent', sa.String(length=255), nullable=True),
+        sa.Column('message', sa.String(length=255), nullable=True),
+    ]
+
+
+def _id(table: str) -> sa.Column:
+    # Keeps drawing from the existing sequence, so ids carry on where they were
+    return sa.Column(
+        'id', sa.Integer(), nullable=False,
+        server_default=sa.text(f"nextval('{table}_id_seq'::regclass)"),
+    )
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _set_aside(table: str, suffix: str) -> None:
+    """Rename a table with its primary key and id index, freeing the names."""
+    op.rename_table(table, f'{table}_{suffix}')
+    op.execute(f'ALTER TABLE {table}_{suffix} RENAME CONSTRAINT {table}_pkey TO {table}_{suffix}_pkey')
+    op.execute(f'ALTER INDEX ix_{table}_id RENAME TO ix_{table}_{suffix}_id')
+
+
+def _copy(source: str, table: str, timestamp: str = 'timestamp', params=None) -> None:
+    names = ', '.join(COLUMNS[table])
+    selected = ', '.join(COLUMNS[table][:-1] + [timestamp])
+    op.get_bind().execute(
+        sa.text(f'INSERT INTO {table} ({names}) SELECT {selected} FROM {source}'),
+        params or {},
+    )
+    # Hand the sequence to the new table before the old one (its owner) is dropped
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+    op.drop_table(source)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    connection = op.get_bind()
+    # Rows written without a timestamp are filed under the time of the migration
+    now = datetime.utcnow()
+
+    for table in ('audit_logs', 'login_audit_logs'):
+        _set_aside(table, 'old')
+        op.create_table(
+            table,
+            _id(table),
+            *_columns(table),
+            sa.Column('timestamp', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id', 'timestamp'),
+            postgresql_partition_by='RANGE (timestamp)',
+        )
+
+        # One partition per month that has rows, named like the ones
+        # app/utils/audit_maintenance.py creates; its next run adds the months
+        # ahead and retention drops the expired ones
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+        months = connection.execute(
+            sa.text(
+                f"SELECT DISTINCT date_trunc('month', COALESCE(timestamp, :now))::date "
+                f"FROM {table}_old"
+            ),
+            {'now': now},
+        ).scalars().all()
+        for month in sorted(months):
+            op.execute(
+                f"CREATE TABLE {table}_{month:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+            )
+
+        _copy(f'{table}_old', table, 'COALESCE(timestamp, :now)', {'now': now})
+        op.create_index(f'ix_{table}_id', table, ['id'])
+
+    op.create_index('ix_audit_logs_record', 'audit_logs', ['table_name', 'record_id', 'timestamp'])
+    op.create_index('ix_login_audit_logs_user_time', 'login_audit_logs', ['user_id', 'timestamp'])
+
+    op.create_table(
+        'audit_log_summaries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('record_id', sa.Integer(), nullable=True),
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('creates', sa.Integer(), nullable=False),
+        sa.Column('updates', sa.Integer(), nullable=False),
+        sa.Column('deletes', sa.Integer(), nullable=False),
+        sa.Column('first_at', sa.DateTime(), nullable=False),
+        sa.Column('last_at', sa.DateTime(), nullable=False),
+        sa.Column('last_user_id', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('table_name', 'record_id', 'month', name='uq_audit_log_summaries_record_month'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('audit_log_summaries')
+    op.drop_index('ix_login_audit_logs_user_time', table_name='login_audit_logs')
+    op.drop_index('ix_audit_logs_record', table_name='audit_logs')
+
+    for table in ('audit_logs', 'login_audit_logs'):
+        _set_aside(table, 'partitioned')
+        op.create_table(
+            table,
+            _id(table),
+            *_columns(table),
+            sa.Column('timestamp', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        # Dropping the partitioned parent drops its partitions with it
+        _copy(f'{table}_partitioned', table)
+        op.create_index(f'ix_{table}_id', table, ['id'])
@@ -0,0 +1,68 @@
+"""normalized name columns and per-parent unique constraints
+
+Revision ID: c41d9a6e5f27
+Revises: 8b2e4f71c0a3
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d9a6e5f27'
+down_revision: Union[str, Sequence[str], None] = '8b2e4f71c0a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same expression as app.models.tasks.normalized()
+NORMALIZED = "regexp_replace(lower({}), '[[:space:]_-]+', '', 'g')"
+
+# (table, scope column, name column, name length, generated column, constraint)
+UNIQUE_NAMES = [
+    ('boards', 'user_id', 'name', 255, 'name_normalized', 'uq_boards_user_name'),
+    ('board_columns', 'board_id', 'name', 100, 'name_normalized', 'uq_board_columns_board_name'),
+    ('tasks', 'column_id', 'title', 255, 'title_normalized', 'uq_tasks_column_title'),
+    ('subtasks', 'task_id', 'title', 255, 'title_normalized', 'uq_subtasks_task_title'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, scope, name, length, normalized, constraint in UNIQUE_NAMES:
+        # Rows written before the constraint may collide once normalized: the
+        # oldest row keeps its name, later ones get " (<id>)" appended so the
+        # constraint can be created. The id keeps every new name distinct.
+        op.execute(
+            f"""
+            UPDATE {table} AS target
+            SET {name} = left(target.{name}, {length} - length(' (' || target.id || ')'))
+                         || ' (' || target.id || ')'
+            FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY {scope}, {NORMALIZED.format(name)} ORDER BY id
+                ) AS duplicate
+                FROM {table}
+            ) AS ranked
+            WHERE target.id = ranked.id AND ranked.duplicate > 1
+            """
+        )
+        op.add_column(
+            table,
+            sa.Column(
+                normalized,
+                sa.String(length),
+                sa.Computed(NORMALIZED.format(name), persisted=True),
+            ),
+        )
+        op.create_unique_constraint(constraint, table, [scope, normalized])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Renamed duplicates keep their suffixed names
+    for table, _, _, _, normalized, constraint in reversed(UNIQUE_NAMES):
+        op.drop_constraint(constraint, table, type_='unique')
+        op.drop_column(table, normalized)
@@ -0,0 +1,51 @@
+"""add tasks.subtask_total and tasks.subtask_completed
+
+Revision ID: e7c3a1f84b62
+Revises: 5d0e7b3a9c14
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c3a1f84b62'
+down_revision: Union[str, Sequence[str], None] = '5d0e7b3a9c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'tasks',
+        sa.Column('subtask_total', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.add_column(
+        'tasks',
+        sa.Column('subtask_completed', sa.Integer(), nullable=False, server_default='0'),
+    )
+    # Count the existing subtasks; tasks without any keep the 0 default
+    op.execute(
+        """
+        UPDATE tasks
+        SET subtask_total = counts.total, subtask_completed = counts.completed
+        FROM (
+            SELECT task_id,
+                   count(*) AS total,
+                   count(*) FILTER (WHERE is_completed) AS completed
+            FROM subtasks
+            GROUP BY task_id
+        ) AS counts
+        WHERE tasks.id = counts.task_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tasks', 'subtask_completed')
+    op.drop_column('tasks', 'subtask_total')
@@ -0,0 +1,60 @@
+"""lookup indexes on auth_user, password_otp and revoked_tokens, built concurrently
+
+Revision ID: f1b7c5d3e948
+Revises: d6a9b4e2c837
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b7c5d3e948'
+down_revision: Union[str, Sequence[str], None] = 'd6a9b4e2c837'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, covering columns). ix_tasks_column_rank is created
+# with tasks.rank in 2a9f4c7e1d38.
+INDEXES = [
+    ('ix_auth_user_email', 'auth_user', ['email'], None),
+    ('ix_password_otp_email_type', 'password_otp', ['email', 'type'], None),
+    ('ix_revoked_tokens_revoked_at', 'revoked_tokens', ['revoked_at'], ['jti']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps the tables writable while the indexes build (logins,
+    # OTPs and revocations keep working), but can't run inside a transaction
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        for name, table, columns, include in INDEXES:
+            # A failed concurrent build leaves an INVALID index behind, which
+            # IF NOT EXISTS would then skip: drop it and build again
+            invalid = connection.scalar(
+                sa.text(
+                    "SELECT NOT indisvalid FROM pg_index "
+                    "WHERE indexrelid = to_regclass(:name)"
+                ),
+                {'name': name},
+            )
+            if invalid:
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+            op.create_index(
+                name, table, columns,
+                postgresql_include=include or [],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,61 @@
+import json
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from uuid import UUID
+
+from app.utils.audit import encode_value
+
+CHANGES = 20_000
+
+
+class Status(Enum):
+    OPEN = "open"
+
+
+def _change(i: int) -> dict:
+    return {
+        "title": {"old": f"Task {i}", "new": f"Task {i + 1}"},
+        "column_id": {"old": i, "new": i + 1},
+        "due": {"old": None, "new": date(2026, 10, 17)},
+        "updated_at": {"old": datetime(2026, 10, 17, 12, 0, i % 60), "new": datetime(2026, 10, 17, 12, 1)},
+        "estimate": {"old": Decimal("1.10"), "new": Decimal("2.25")},
+        "tags": {"old": {"a"}, "new": frozenset({"a", "b"})},
+        "status": {"old": None, "new": Status.OPEN},
+    }
+
+
+def test_changes_encode_to_json_native_values():
+    moment = datetime(2026, 10, 17, 12, 30)
+    encoded = encode_value({
+        "at": moment, "on": moment.date(), "amount": Decimal("0.10"), "status": Status.OPEN,
+        "ids": {moment}, "key": UUID(int=1), 3: (1, "x"),
+    })
+    assert encoded == {
+        "at": "2026-10-17T12:30:00", "on": "2026-10-17", "amount": "0.10", "status": "open",
+        "ids": ["2026-10-17T12:30:00"], "key": "00000000-0000-0000-0000-000000000001", "3": [1, "x"],
+    }
+    # Stored as an object by the driver's single json.dumps, no str() fallback needed
+    assert json.loads(json.dumps(encoded)) == encoded
+
+
+def test_encode_cost_per_change():
+    changes = [_change(i) for i in range(CHANGES)]
+
+    started = time.perf_counter()
+    for change in changes:
+        json.dumps(encode_value(change))
+    encoded = time.perf_counter() - started
+
+    # The old path: json.dumps with a str() default hook into a string, which the
+    # JSON column then encoded a second time
+    started = time.perf_counter()
+    for change in changes:
+        json.dumps(json.dumps(change, default=str))
+    double_encoded = time.perf_counter() - started
+
+    print(
+        f"\nencode {CHANGES} changes: {encoded / CHANGES * 1e6:.1f} µs per change "
+        f"(double-encoded with a default hook: {double_encoded / CHANGES * 1e6:.1f} µs)"
+    )
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+from sqlalchemy import func, inspect, select
+
+from app.models.audit import AuditLog
+from app.models.tasks import Board, BoardColumn, Task
+from app.utils import audit
+from app.utils.lexorank import evenly_spaced_ranks
+
+pytestmark = pytest.mark.anyio
+
+TASKS = 500
+
+
+@pytest.fixture
+async def task_ids(db, user):
+    column = BoardColumn(name="Backlog", tasks=[
+        Task(title=f"Task {i}", rank=rank) for i, rank in enumerate(evenly_spaced_ranks(TASKS))
+    ])
+    db.add(Board(name="Board", user_id=user.id, columns=[column]))
+    await db.commit()
+    return [task.id for task in column.tasks]
+
+
+async def _flush_updates(db, engine, query_counter, task_ids, description):
+    """Update every task in memory, then time and count the flush alone."""
+    db.expunge_all()
+    tasks = (await db.scalars(select(Task).where(Task.id.in_(task_ids)))).all()
+    for task in tasks:
+        task.description = description
+    with query_counter(engine) as counter:
+        started = time.perf_counter()
+        await db.flush()
+        elapsed = time.perf_counter() - started
+    await db.commit()
+    return counter, elapsed
+
+
+async def test_audit_flush_overhead(db, engine, query_counter, monkeypatch, task_ids):
+    task_mapper = inspect(Task)
+    assert audit.audit_plan(task_mapper) is audit.audit_plan(task_mapper)
+    audited = await db.scalar(select(func.count()).select_from(AuditLog))
+
+    with monkeypatch.context() as patch:
+        patch.setitem(audit._plans, task_mapper, audit.AuditPlan(table_name="tasks", enabled=False))
+        off, off_seconds = await _flush_updates(db, engine, query_counter, task_ids, "off")
+    assert await db.scalar(select(func.count()).select_from(AuditLog)) == audited
+
+    on, on_seconds = await _flush_updates(db, engine, query_counter, task_ids, "on")
+    assert await db.scalar(select(func.count()).select_from(AuditLog)) == audited + TASKS
+
+    # However many rows changed: one board lookup for the records' scope and
+    # one multi-row INSERT of the audit rows, inside SAVEPOINT ... RELEASE
+    assert on.count - off.count == 4, on.statements
+    print(
+        f"\nflush of {TASKS} updates: {off_seconds * 1000:.1f} ms without auditing, "
+        f"{on_seconds * 1000:.1f} ms with "
+        f"({(on_seconds - off_seconds) / TASKS * 1e6:.1f} µs per audited row)"
+    )
+
+
+async def test_a_failed_audit_insert_keeps_the_change(db, task_ids, caplog):
+    audited = await db.scalar(select(func.count()).select_from(AuditLog))
+    task = await db.get(Task, task_ids[0])
+    task.description = "kept"
+    # An actor that doesn't exist: the audit row violates its user FK
+    db.sync_session.current_user = 10**6
+    try:
+        await db.commit()
+    finally:
+        del db.sync_session.current_user
+
+    db.expire_all()
+    assert (await db.get(Task, task_ids[0])).description == "kept"
+    assert await db.scalar(select(func.count()).select_from(AuditLog)) == audited
+    assert "Audit capture failed" in caplog.text
+    assert "ForeignKeyViolation" in caplog.text
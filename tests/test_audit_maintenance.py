@@ -0,0 +1,42 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import func, select, text
+
+from app.models.audit import AuditLog
+from app.utils.audit_maintenance import ensure_partitions
+
+pytestmark = pytest.mark.anyio
+
+TODAY = date(2026, 10, 17)
+
+
+def _log(timestamp: datetime) -> AuditLog:
+    return AuditLog(table_name="tasks", record_id=1, action="UPDATE", timestamp=timestamp)
+
+
+async def _count(db, table: str) -> int:
+    return await db.scalar(text(f"SELECT count(*) FROM {table}"))
+
+
+async def test_rows_caught_by_the_default_partition_move_to_their_month(db):
+    # Written while maintenance was behind: October had no partition yet
+    db.add_all([_log(datetime(2026, 10, 1)), _log(datetime(2026, 10, 16, 23, 59)), _log(datetime(2031, 1, 1))])
+    await db.commit()
+
+    created, moved = await ensure_partitions(db, TODAY)
+    await db.commit()
+
+    assert "audit_logs_2026_10" in created
+    assert moved == {"audit_logs_2026_10": 2}
+    assert await _count(db, "audit_logs_2026_10") == 2
+    assert await _count(db, "audit_logs_default") == 1
+    assert await db.scalar(select(func.count()).select_from(AuditLog)) == 3
+
+    # The default partition is attached again and still catches unplanned months
+    db.add(_log(datetime(2032, 1, 1)))
+    await db.commit()
+    assert await _count(db, "audit_logs_default") == 2
+
+    # A second run finds nothing left to create
+    assert await ensure_partitions(db, TODAY) == ([], {})
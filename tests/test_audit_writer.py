@@ -0,0 +1,38 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.audit import AuditLog
+from app.utils.audit import AuditWriter
+
+pytestmark = pytest.mark.anyio
+
+
+def _record(record_id: int) -> dict:
+    return {
+        "table_name": "tasks",
+        "record_id": record_id,
+        "action": "UPDATE",
+        "changed_data": None,
+        "user_id": None,
+        "ip_address": None,
+        "timestamp": datetime.utcnow(),
+    }
+
+
+async def test_stop_writes_the_batch_the_writer_is_holding(db, engine):
+    # A long flush interval keeps the first records in the writer's hands
+    writer = AuditWriter(max_size=100, batch_size=50, flush_interval=60)
+    writer.start()
+    writer.submit([_record(i) for i in range(3)])
+    await asyncio.sleep(0.05)
+    writer.submit([_record(i) for i in range(3, 5)])
+
+    await writer.stop()
+
+    assert writer.written == 5
+    assert await db.scalar(select(func.count()).select_from(AuditLog)) == 5
+    writer.submit([_record(5)])
+    assert writer.dropped == 1
@@ -0,0 +1,144 @@
+import statistics
+import time
+
+import pytest
+from sqlalchemy import text
+
+from app.models.tasks import Board, BoardColumn, Task, SubTask
+from app.services import board_service
+from app.utils.board_cache import BoardSnapshotCache
+from app.utils.lexorank import evenly_spaced_ranks
+
+pytestmark = pytest.mark.anyio
+
+
+async def _seed(db, user, boards: int, columns: int, tasks: int, subtasks: int) -> None:
+    for b in range(boards):
+        board = Board(name=f"Board {b}", user_id=user.id)
+        for c in range(columns):
+            column = BoardColumn(name=f"Column {c}")
+            for t, rank in enumerate(evenly_spaced_ranks(tasks)):
+                column.tasks.append(Task(
+                    title=f"Task {t}",
+                    rank=rank,
+                    subtask_total=subtasks,
+                    subtasks=[SubTask(title=f"Subtask {s}") for s in range(subtasks)],
+                ))
+            board.columns.append(column)
+        db.add(board)
+    await db.commit()
+
+
+@pytest.mark.parametrize("boards", [1, 4])
+async def test_board_details_query_count_is_constant(engine, db, user, monkeypatch, query_counter, boards):
+    monkeypatch.setattr(board_service, "board_cache", BoardSnapshotCache(max_entries=100))
+    await _seed(db, user, boards=boards, columns=3, tasks=5, subtasks=2)
+    service = board_service.BoardService(db)
+
+    # Cold cache: boards, then one query per level (columns, tasks, subtasks)
+    with query_counter(engine) as counter:
+        result = await service.get_boards_with_details(user)
+    assert counter.count == 4
+    assert len(result["data"]) == boards
+    assert all(len(column["tasks"]) == 5 for board in result["data"] for column in board["columns"])
+
+    # Warm cache: only the boards query, the trees come from the snapshot cache
+    with query_counter(engine) as counter:
+        await service.get_boards_with_details(user)
+    assert counter.count == 1
+
+
+async def test_board_larger_than_the_bind_parameter_limit_loads(engine, db, user, monkeypatch):
+    # asyncpg allows 32767 bind parameters per statement; one per task id would not fit
+    monkeypatch.setattr(board_service, "board_cache", BoardSnapshotCache(max_entries=100))
+    board = Board(name="Large", user_id=user.id, columns=[BoardColumn(name="Backlog")])
+    db.add(board)
+    await db.commit()
+    column_id = board.columns[0].id
+    await db.execute(text(
+        """
+        INSERT INTO tasks (title, column_id, rank, subtask_total, subtask_completed)
+        SELECT 'Task ' || i, :column_id, lpad(to_hex(i), 8, '0'), 1, 0
+        FROM generate_series(1, 40000) AS i
+        """
+    ), {"column_id": column_id})
+    await db.execute(text(
+        "INSERT INTO subtasks (title, is_completed, task_id) "
+        "SELECT 'Step', false, id FROM tasks WHERE column_id = :column_id"
+    ), {"column_id": column_id})
+    await db.commit()
+
+    result = await board_service.BoardService(db).get_boards_with_details(user)
+    tasks = result["data"][0]["columns"][0]["tasks"]
+    assert len(tasks) == 40000
+    assert all(len(task["subtasks"]) == 1 for task in tasks)
+
+
+# Lookup indexes: (index, its table, the query it serves). The benchmark times
+# each query on a seeded table with the index, then after dropping it.
+LOOKUPS = [
+    ("ix_tasks_column_rank", "tasks",
+     "SELECT id, title FROM tasks WHERE column_id = :column_id ORDER BY rank, id LIMIT 50"),
+    ("ix_auth_user_email", "auth_user",
+     "SELECT id FROM auth_user WHERE email = :email"),
+    ("ix_password_otp_email_type", "password_otp",
+     "SELECT id FROM password_otp WHERE email = :email AND type = 'otp'"),
+    ("ix_revoked_tokens_revoked_at", "revoked_tokens",
+     "SELECT jti, revoked_at FROM revoked_tokens WHERE revoked_at >= :since"),
+]
+ROWS = 200_000
+
+
+async def _median_ms(db, statement: str, params: dict, runs: int = 15) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await db.execute(text(statement), params)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def test_lookup_indexes_on_seeded_tables(db, user):
+    board = Board(name="Large", user_id=user.id)
+    db.add(board)
+    await db.commit()
+    # ROWS tasks over 1000 columns, and ROWS users, OTPs and revoked tokens
+    for statement in (
+        "INSERT INTO board_columns (name, board_id) SELECT 'Column ' || i, :board_id FROM generate_series(1, 1000) AS i",
+        """
+        INSERT INTO tasks (title, column_id, rank, subtask_total, subtask_completed)
+        SELECT 'Task ' || i, c.id, lpad(to_hex(i), 8, '0'), 0, 0
+        FROM generate_series(1, :rows) AS i
+        JOIN board_columns c ON c.board_id = :board_id AND c.name = 'Column ' || (i % 1000 + 1)
+        """,
+        "INSERT INTO auth_user (full_name, email, password) "
+        "SELECT 'User ' || i, 'user' || i || '@example.com', 'x' FROM generate_series(1, :rows) AS i",
+        "INSERT INTO password_otp (email, otp, type) "
+        "SELECT 'user' || i || '@example.com', 123456, 'otp' FROM generate_series(1, :rows) AS i",
+        "INSERT INTO revoked_tokens (jti, revoked_at) "
+        "SELECT 'jti-' || i, now() - i * interval '1 second' FROM generate_series(1, :rows) AS i",
+    ):
+        await db.execute(text(statement), {"board_id": board.id, "rows": ROWS})
+    column_id = await db.scalar(text("SELECT min(id) FROM board_columns WHERE board_id = :id"), {"id": board.id})
+    await db.commit()
+    for _, table, _ in LOOKUPS:
+        await db.execute(text(f"ANALYZE {table}"))
+    await db.commit()
+    params = {
+        "column_id": column_id,
+        "email": f"user{ROWS // 2}@example.com",
+        # The last minute of revocations, as the cache's incremental refresh reads
+        "since": await db.scalar(text("SELECT max(revoked_at) - interval '1 minute' FROM revoked_tokens")),
+    }
+
+    report = []
+    for index, _, statement in LOOKUPS:
+        plan = "\n".join((await db.execute(text(f"EXPLAIN {statement}"), params)).scalars())
+        assert index in plan, plan
+        indexed = await _median_ms(db, statement, params)
+        # DDL in the test's own transaction; rolled back below
+        await db.execute(text(f"DROP INDEX {index}"))
+        unindexed = await _median_ms(db, statement, params)
+        await db.rollback()
+        report.append(f"{index}: {indexed:.2f} ms with, {unindexed:.2f} ms without")
+    print(f"\nmedian latency at {ROWS} rows per table\n" + "\n".join(report))
@@ -0,0 +1,37 @@
+import pytest
+
+from app.models.tasks import Board, BoardColumn, Task
+from app.services.column_service import ColumnService
+from app.services.task_servie import TaskService
+from app.utils.lexorank import evenly_spaced_ranks
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def board_id(db, user):
+    columns = [
+        BoardColumn(name=f"Column {size}", tasks=[
+            Task(title=f"Task {i}", rank=rank) for i, rank in enumerate(evenly_spaced_ranks(size))
+        ])
+        for size in (0, 2, 5)
+    ]
+    board = Board(name="Board", user_id=user.id, columns=columns)
+    db.add(board)
+    await db.commit()
+    return board.id
+
+
+async def test_first_tasks_of_each_column_continue_in_the_column_listing(db, user, board_id):
+    columns = (await ColumnService(db).get_columns(board_id, user, tasks_per_column=3))["data"]
+    assert [column["task_count"] for column in columns] == [0, 2, 5]
+    assert [len(column["tasks"]) for column in columns] == [0, 2, 3]
+    assert [column["next_cursor"] is not None for column in columns] == [False, False, True]
+
+    full = (await ColumnService(db).get_columns(board_id, user))["data"]
+    assert [column["task_count"] for column in full] == [0, 2, 5]
+
+    longest, expected = columns[2], full[2]["tasks"]
+    assert longest["tasks"] == expected[:3]
+    rest = (await TaskService(db).get_tasks(longest["id"], user, cursor=longest["next_cursor"]))["data"]
+    assert [(t["id"], t["position"]) for t in rest["tasks"]] == [(t["id"], t["position"]) for t in expected[3:]]
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from app.utils.lexorank import DIGITS, evenly_spaced_ranks, rank_after, rank_before, rank_between
+
+
+def _byte_sorted(keys):
+    return sorted(keys, key=lambda key: key.encode("ascii"))
+
+
+def test_digits_are_in_byte_order():
+    assert list(DIGITS) == _byte_sorted(DIGITS)
+
+
+def test_open_ends():
+    middle = rank_between(None, None)
+    assert rank_between(middle, None) > middle
+    assert rank_between(None, middle) < middle
+
+
+@pytest.mark.parametrize("before, after", [("V", "V"), ("b", "a"), ("V1", "V")])
+def test_rejects_keys_out_of_order(before, after):
+    with pytest.raises(ValueError):
+        rank_between(before, after)
+
+
+@pytest.mark.parametrize("before, after", [("V", "W"), ("V", "V1"), ("0V", "1"), ("z", "z01"), ("a", "az")])
+def test_result_sorts_strictly_between(before, after):
+    rank = rank_between(before, after)
+    assert before < rank < after
+    assert not rank.endswith("0")
+
+
+def test_repeated_appends_and_prepends_stay_ordered():
+    keys = [rank_between(None, None)]
+    for _ in range(200):
+        keys.append(rank_after(keys[-1]))
+        keys.insert(0, rank_before(keys[0]))
+    assert keys == _byte_sorted(set(keys))
+
+
+def test_random_inserts_keep_a_strict_byte_order():
+    rng = random.Random(7)
+    keys = evenly_spaced_ranks(5)
+    for _ in range(2000):
+        slot = rng.randint(0, len(keys))
+        before = keys[slot - 1] if slot else None
+        after = keys[slot] if slot < len(keys) else None
+        keys.insert(slot, rank_between(before, after))
+    assert keys == _byte_sorted(set(keys))
+
+
+def test_repeated_midpoints_between_two_neighbours():
+    before, after = "V", "W"
+    for _ in range(100):
+        before = rank_between(before, after)
+    assert "V" < before < "W"
+
+
+@pytest.mark.parametrize("count", [1, 2, 10, 61, 62, 1000])
+def test_evenly_spaced_ranks(count):
+    ranks = evenly_spaced_ranks(count)
+    assert len(ranks) == count
+    assert len({len(rank) for rank in ranks}) == 1
+    assert ranks == _byte_sorted(set(ranks))
+    # Room for a new key between every pair of neighbours and at both ends
+    for before, after in zip([None] + ranks, ranks + [None]):
+        rank_between(before, after)
+
+
+def test_evenly_spaced_ranks_empty():
+    assert evenly_spaced_ranks(0) == []
@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.tasks import Board
+from app.models.users import AuthUser
+from app.services.auth_service import AuthService
+from app.utils.hashing import password_hasher
+from tests.conftest import TEST_DATABASE_URL
+
+pytestmark = pytest.mark.anyio
+
+LOGINS = 24
+POOL_SIZE = 2
+STORM = 48
+
+
+async def test_concurrent_logins_do_not_hold_pooled_connections(engine, db):
+    password = "Benchmark-Passw0rd!"
+    db.add(AuthUser(
+        full_name="Bench User", email="bench@example.com",
+        password=await password_hasher.hash(password),
+    ))
+    await db.commit()
+
+    # A pool far smaller than the number of concurrent logins, with a timeout
+    # shorter than the time bcrypt needs for all of them: checkouts only
+    # succeed if no login keeps its connection while hashing.
+    small = create_async_engine(
+        TEST_DATABASE_URL, pool_size=POOL_SIZE, max_overflow=0, pool_timeout=1
+    )
+    factory = sessionmaker(bind=small, class_=AsyncSession, expire_on_commit=False)
+
+    async def login():
+        async with factory() as session:
+            result = await AuthService(session).login("bench@example.com", password, None)
+            assert result["success"]
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(login() for _ in range(LOGINS)))
+    finally:
+        await small.dispose()
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"\n{LOGINS} logins over {POOL_SIZE} connections / {password_hasher.max_workers} "
+        f"hash workers: {elapsed:.2f}s, {LOGINS / elapsed:.1f} logins/sec"
+    )
+
+
+def _percentile(samples: list, p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+
+
+async def test_unrelated_requests_stay_fast_during_a_login_storm(db, client, user, auth_headers):
+    password = "Storm-Passw0rd!"
+    hashed = await password_hasher.hash(password)
+    db.add(AuthUser(full_name="Storm User", email="storm@example.com", password=hashed))
+    board = Board(name="Board", user_id=user.id)
+    db.add(board)
+    await db.commit()
+
+    # One bcrypt verification: what every request would wait for if hashing
+    # ran on the event loop
+    started = time.perf_counter()
+    await password_hasher.verify(password, hashed)
+    bcrypt_seconds = time.perf_counter() - started
+
+    storm_done = asyncio.Event()
+    latencies = []
+
+    async def login():
+        response = await client.post(
+            "/api/v1/auth/login/", json={"email": "storm@example.com", "password": password}
+        )
+        assert response.status_code == 200, response.text
+
+    async def storm():
+        try:
+            await asyncio.gather(*(login() for _ in range(STORM)))
+        finally:
+            storm_done.set()
+
+    async def probe():
+        while not storm_done.is_set():
+            started = time.perf_counter()
+            response = await client.get(f"/api/v1/board/{board.id}", headers=auth_headers)
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200
+
+    await asyncio.gather(storm(), probe())
+
+    p50, p99 = _percentile(latencies, 0.50), _percentile(latencies, 0.99)
+    print(
+        f"\nGET /board/{{id}} during {STORM} logins ({len(latencies)} requests, "
+        f"bcrypt {bcrypt_seconds * 1000:.0f} ms): p50 {p50 * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms; "
+        f"hasher {password_hasher.stats()}"
+    )
+    assert len(latencies) >= 10
+    assert p99 < bcrypt_seconds
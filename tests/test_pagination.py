@@ -0,0 +1,29 @@
+import pytest
+
+from app.core.response import AppException
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_round_trip():
+    cursor = encode_cursor(id=7, position=3)
+    assert decode_cursor(cursor, id=int, position=int) == {"id": 7, "position": 3}
+
+
+@pytest.mark.parametrize("key", [
+    {"id": "7", "position": 3},
+    {"id": 7.5, "position": 3},
+    {"id": 7, "position": None},
+    {"id": True, "position": 3},
+    {"id": 7},
+])
+def test_fields_of_the_wrong_type_are_a_bad_request(key):
+    with pytest.raises(AppException) as error:
+        decode_cursor(encode_cursor(**key), id=int, position=int)
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "W10", "bnVsbA"])
+def test_malformed_cursors_are_a_bad_request(cursor):
+    with pytest.raises(AppException) as error:
+        decode_cursor(cursor, id=int)
+    assert error.value.status_code == 400
@@ -0,0 +1,32 @@
+import time
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+from app.core.db import LAST_WRITE_COOKIE, LAST_WRITE_HEADER, mark_last_write, wrote_recently
+
+
+def _request(headers: dict) -> Request:
+    return Request({
+        "type": "http",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_write_stamp_round_trips_through_cookie_and_header():
+    response = Response()
+    mark_last_write(response)
+    written_at = response.headers[LAST_WRITE_HEADER]
+    assert f"{LAST_WRITE_COOKIE}={written_at}" in response.headers["set-cookie"]
+
+    assert wrote_recently(_request({LAST_WRITE_HEADER: written_at}))
+    assert wrote_recently(_request({"Cookie": f"{LAST_WRITE_COOKIE}={written_at}"}))
+
+
+def test_stale_missing_or_malformed_stamps_read_from_the_replica():
+    window = settings.READ_YOUR_WRITES_SECONDS
+    now = int(time.time())
+    assert not wrote_recently(_request({}))
+    assert not wrote_recently(_request({LAST_WRITE_HEADER: "yesterday"}))
+    assert not wrote_recently(_request({LAST_WRITE_HEADER: str(now - window - 1)}))
+    assert not wrote_recently(_request({LAST_WRITE_HEADER: str(now + window + 60)}))
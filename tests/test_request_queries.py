@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import select
+
+from app.models.tasks import Board, BoardColumn, Task
+from app.utils.identity_cache import identity_cache
+
+pytestmark = pytest.mark.anyio
+
+
+def _reading(counter, table: str) -> int:
+    return sum(f"FROM {table}" in statement for statement in counter.statements)
+
+
+@pytest.fixture
+async def board_id(db, user):
+    board = Board(name="Board", user_id=user.id, columns=[
+        BoardColumn(name="Todo", tasks=[Task(title="Write docs", rank="V")]),
+    ])
+    db.add(board)
+    await db.commit()
+    return board.id
+
+
+async def test_a_request_authenticates_once(client, app_engine, auth_headers, query_counter, user, board_id):
+    identity_cache.invalidate(user.id)
+
+    # Cold: the middleware loads the user once; get_current_user reuses it
+    with query_counter(app_engine) as counter:
+        response = await client.get(f"/api/v1/board/{board_id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert _reading(counter, "auth_user") == 1
+    assert _reading(counter, "revoked_tokens") <= 1
+    assert counter.count == 1 + _reading(counter, "auth_user") + _reading(counter, "revoked_tokens")
+
+    # Warm: only the endpoint's own query
+    with query_counter(app_engine) as counter:
+        response = await client.get(f"/api/v1/board/{board_id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert counter.count == 1
+
+
+# Statements per write endpoint, with one commit each (the request's unit of
+# work). Audit rows are inserted in the same transaction (AUDIT_MODE=sync);
+# nothing is re-read after a write, RETURNING brings back generated values.
+# Each "audit" below is three statements: SAVEPOINT, the INSERT, RELEASE.
+WRITES = [
+    # board, audit, columns (one multi-row INSERT), audit
+    ("POST", "/api/v1/board/create", lambda ids: {"name": "Roadmap", "columns": [{"name": "A"}, {"name": "B"}]}, 8),
+    # board, column, audit, board version
+    ("POST", "/api/v1/column/create", lambda ids: {"name": "Later", "board_id": ids["board"]}, 6),
+    # column, rename, audit, board version
+    ("PUT", "/api/v1/column/{column}", lambda ids: {"name": "Doing"}, 6),
+    # column lock, column with last rank and title check, task, subtasks,
+    # audit scope, audit, board version
+    ("POST", "/api/v1/tasks/create", lambda ids: {
+        "title": "Ship", "column_id": ids["column"], "subtasks": [{"title": "Tag"}, {"title": "Publish"}],
+    }, 9),
+    # task with board, update, audit scope, audit, board version
+    ("PUT", "/api/v1/tasks/{task}", lambda ids: {"title": "Write more docs", "description": "All of them"}, 7),
+]
+
+
+@pytest.mark.parametrize("method, path, body, statements", WRITES, ids=[f"{m} {p}" for m, p, _, _ in WRITES])
+async def test_write_round_trips(
+    db, client, app_engine, auth_headers, query_counter, board_id, method, path, body, statements
+):
+    column = await db.scalar(select(BoardColumn.id).where(BoardColumn.board_id == board_id))
+    ids = {"board": board_id, "column": column, "task": await db.scalar(select(Task.id))}
+    # Authenticate first, so only the endpoint's own statements are counted
+    await client.get(f"/api/v1/board/{board_id}", headers=auth_headers)
+
+    with query_counter(app_engine) as counter:
+        response = await client.request(method, path.format(**ids), json=body(ids), headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert counter.commits == 1
+    assert counter.count == statements, counter.statements
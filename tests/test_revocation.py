@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.users import RevokedToken
+from app.utils.revocation import RevokedTokenCache
+
+pytestmark = pytest.mark.anyio
+
+
+def _epoch(moment: datetime) -> int:
+    return int((moment - datetime(1970, 1, 1)).total_seconds())
+
+
+async def test_cache_stays_bounded_and_falls_back_for_evicted_tokens(db):
+    cache = RevokedTokenCache(max_entries=10, refresh_seconds=3600, retention=timedelta(days=7))
+    start = datetime.utcnow() - timedelta(hours=1)
+    revoked = [(f"jti-{i}", start + timedelta(minutes=i)) for i in range(25)]
+    db.add_all(RevokedToken(jti=jti, revoked_at=revoked_at) for jti, revoked_at in revoked)
+    await db.commit()
+
+    # Initial load reads at most max_entries + 1 rows and trims the oldest
+    assert await cache.is_revoked(db, "jti-24")
+    assert len(cache._revoked) <= 10
+    for jti, revoked_at in revoked[:5]:
+        cache.add(f"{jti}-local", revoked_at)
+    assert len(cache._revoked) <= 10
+
+    # An evicted token is still found, through the database
+    misses = cache.misses
+    assert await cache.is_revoked(db, "jti-0", _epoch(start) - 60)
+    assert cache.misses == misses + 1
+
+    # A token issued after every evicted revocation is answered from memory
+    assert not await cache.is_revoked(db, "never-revoked", _epoch(datetime.utcnow()))
+    assert cache.misses == misses + 1
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.core.response import AppException
+from app.models.tasks import Board, BoardColumn, SubTask, Task
+from app.schema.task_schema import SubTaskCreate, SubTaskUpdate, TaskUpdate
+from app.services.sub_task_service import SubTaskService
+from app.services.task_servie import TaskService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def task(db, user):
+    task = Task(
+        title="Release", rank="V", subtask_total=2, subtask_completed=0,
+        subtasks=[SubTask(title="Tag"), SubTask(title="Publish")],
+    )
+    db.add(Board(name="Board", user_id=user.id, columns=[BoardColumn(name="Todo", tasks=[task])]))
+    await db.commit()
+    return {"id": task.id, "subtasks": [st.id for st in task.subtasks]}
+
+
+async def _concurrently(session_factory, calls):
+    async def run(call):
+        async with session_factory() as session:
+            try:
+                await call(SubTaskService(session))
+            except AppException:
+                pass  # the losers of a concurrent delete get a 404
+
+    await asyncio.gather(*(run(call) for call in calls))
+
+
+async def _counters(db, task_id: int):
+    db.expire_all()
+    row = (await db.execute(
+        select(Task.subtask_total, Task.subtask_completed).where(Task.id == task_id)
+    )).one()
+    return tuple(row)
+
+
+async def test_concurrent_toggles_count_each_change_once(db, session_factory, user, task):
+    first, second = task["subtasks"]
+    await _concurrently(session_factory, [
+        lambda service, st=st: service.update_subtask(st, SubTaskUpdate(is_completed=True), user)
+        for st in (first, second) for _ in range(8)
+    ])
+    assert await _counters(db, task["id"]) == (2, 2)
+
+
+async def test_concurrent_deletes_count_the_subtask_once(db, session_factory, user, task):
+    first, _ = task["subtasks"]
+    await SubTaskService(db).update_subtask(first, SubTaskUpdate(is_completed=True), user)
+    await _concurrently(session_factory, [
+        lambda service: service.delete_subtask(first, user) for _ in range(8)
+    ])
+    assert await _counters(db, task["id"]) == (1, 0)
+
+
+async def _counted(db, task_id: int):
+    db.expire_all()
+    total = await db.scalar(select(func.count()).where(SubTask.task_id == task_id))
+    completed = await db.scalar(
+        select(func.count()).where(SubTask.task_id == task_id, SubTask.is_completed.is_(True))
+    )
+    return total, completed
+
+
+async def test_task_edits_and_subtask_creates_keep_the_counters(db, session_factory, user, task):
+    first, second = task["subtasks"]
+
+    async def create(i):
+        async with session_factory() as session:
+            await SubTaskService(session).create_subtask(SubTaskCreate(title=f"Step {i}", task_id=task["id"]), user)
+
+    async def edit(i):
+        async with session_factory() as session:
+            await TaskService(session).update_task(task["id"], TaskUpdate(subtasks=[
+                SubTaskUpdate(id=first, is_completed=i % 2 == 0), SubTaskUpdate(id=second),
+            ]), user)
+
+    await asyncio.gather(*(call(i) for i in range(6) for call in (create, edit)))
+    assert await _counters(db, task["id"]) == await _counted(db, task["id"])
+
+
+async def test_repair_fixes_drifted_counters(db, user, task):
+    await db.execute(update(Task).where(Task.id == task["id"]).values(subtask_total=7, subtask_completed=5))
+    await db.commit()
+    version = await db.scalar(select(Board.version))
+
+    assert await SubTaskService(db).repair_subtask_counters() == 1
+    assert await _counters(db, task["id"]) == (2, 0)
+    assert await db.scalar(select(Board.version)) == version + 1
+    assert await SubTaskService(db).repair_subtask_counters() == 0
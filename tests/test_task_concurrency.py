@@ -0,0 +1,99 @@
+import asyncio
+import random
+import time
+
+import pytest
+from sqlalchemy import select
+
+from app.core.response import AppException
+from app.models.tasks import Board, BoardColumn, Task
+from app.schema.task_schema import TaskMove, TaskUpdate
+from app.services.task_servie import TaskService
+from app.utils.lexorank import evenly_spaced_ranks
+
+pytestmark = pytest.mark.anyio
+
+OPERATIONS = 400
+CONCURRENCY = 16
+TASKS_PER_COLUMN = 8
+
+
+async def _boards(db, user) -> list[int]:
+    """Two boards of three columns each; moves cross boards as well as columns."""
+    column_ids = []
+    for b in range(2):
+        board = Board(name=f"Board {b}", user_id=user.id)
+        for c in range(3):
+            column = BoardColumn(name=f"Column {c}")
+            column.tasks = [
+                Task(title=f"Task {b}.{c}.{t}", rank=rank)
+                for t, rank in enumerate(evenly_spaced_ranks(TASKS_PER_COLUMN))
+            ]
+            board.columns.append(column)
+        db.add(board)
+    await db.commit()
+    for board in (await db.execute(select(Board).where(Board.user_id == user.id))).scalars():
+        column_ids.extend(
+            (await db.execute(select(BoardColumn.id).where(BoardColumn.board_id == board.id))).scalars()
+        )
+    return column_ids
+
+
+async def test_concurrent_moves_keep_every_column_a_valid_permutation(db, session_factory, user):
+    column_ids = await _boards(db, user)
+    task_ids = (await db.execute(select(Task.id))).scalars().all()
+    rng = random.Random(13)
+    operations = [
+        (rng.random(), rng.choice(task_ids), rng.choice(column_ids), rng.randint(1, TASKS_PER_COLUMN + 2))
+        for _ in range(OPERATIONS)
+    ]
+    queue = asyncio.Queue()
+    for operation in operations:
+        queue.put_nowait(operation)
+    outcomes = {"moved": 0, "conflicts": 0}
+
+    async def worker():
+        while not queue.empty():
+            kind, task_id, column_id, position = queue.get_nowait()
+            async with session_factory() as session:
+                service = TaskService(session)
+                try:
+                    if kind < 0.7:
+                        current = await session.scalar(select(Task.column_id).where(Task.id == task_id))
+                        await service.move_task(TaskMove(
+                            task_id=task_id,
+                            source_column_id=current,
+                            destination_column_id=column_id,
+                            destination_position=position,
+                        ), user)
+                    elif kind < 0.9:
+                        await service.update_task(task_id, TaskUpdate(column_id=column_id), user)
+                    else:
+                        await service.update_task(task_id, TaskUpdate(description=f"edit {position}"), user)
+                    outcomes["moved"] += 1
+                except AppException as e:
+                    # Lost a race for the same task: the request asks the client to retry
+                    assert e.status_code == 409, e.message
+                    outcomes["conflicts"] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - started
+    print(
+        f"\n{OPERATIONS} concurrent task writes ({CONCURRENCY} in flight): "
+        f"{outcomes['moved']} applied, {outcomes['conflicts']} conflicts, "
+        f"{OPERATIONS / elapsed:.0f} writes/sec"
+    )
+
+    # Every task is still in exactly one column, and each column has a strict order
+    rows = (await db.execute(
+        select(Task.id, Task.column_id, Task.rank).order_by(Task.column_id, Task.rank, Task.id)
+    )).all()
+    assert sorted(task_id for task_id, _, _ in rows) == sorted(task_ids)
+    by_column: dict[int, list[str]] = {}
+    for _, column_id, rank in rows:
+        by_column.setdefault(column_id, []).append(rank)
+    for ranks in by_column.values():
+        assert len(set(ranks)) == len(ranks)
+        assert ranks == sorted(ranks)
+    assert outcomes["moved"] + outcomes["conflicts"] == OPERATIONS
@@ -0,0 +1,121 @@
+import pytest
+from sqlalchemy import delete, select, text
+
+from app.core.response import AppException
+from app.models.tasks import Board, BoardColumn, Task
+from app.services.column_service import ColumnService
+from app.services.task_rank_service import TaskRankService
+from app.services.task_servie import TaskService
+from app.utils.lexorank import evenly_spaced_ranks
+
+pytestmark = pytest.mark.anyio
+
+
+async def _column_with_tasks(db, user, count: int) -> BoardColumn:
+    column = BoardColumn(name="Todo")
+    column.tasks = [
+        Task(title=f"Task {i}", rank=rank) for i, rank in enumerate(evenly_spaced_ranks(count))
+    ]
+    db.add(Board(name="Board", user_id=user.id, columns=[column]))
+    await db.commit()
+    return column
+
+
+async def _ordered_ranks(db, column_id: int, exclude_task_id=None) -> list[str]:
+    query = select(Task.rank).where(Task.column_id == column_id)
+    if exclude_task_id is not None:
+        query = query.where(Task.id != exclude_task_id)
+    return (await db.execute(query.order_by(Task.rank, Task.id))).scalars().all()
+
+
+async def test_rank_column_uses_byte_order(db, user):
+    collation = await db.scalar(text(
+        "SELECT collation_name FROM information_schema.columns "
+        "WHERE table_name = 'tasks' AND column_name = 'rank'"
+    ))
+    assert collation == "C"
+
+    column = BoardColumn(name="Todo")
+    column.tasks = [Task(title="lower", rank="a"), Task(title="upper", rank="B")]
+    db.add(Board(name="Board", user_id=user.id, columns=[column]))
+    await db.commit()
+    assert await _ordered_ranks(db, column.id) == ["B", "a"]
+
+
+@pytest.mark.parametrize("position", [1, 2, 3, 5, 6, 7, 50])
+async def test_rank_for_position_lands_at_the_position(db, user, position):
+    column = await _column_with_tasks(db, user, 5)
+    ranks = await _ordered_ranks(db, column.id)
+
+    rank = await TaskRankService(db).rank_for_position(column.id, position)
+
+    # Positions past the end clamp to an append
+    assert sorted(ranks + [rank]).index(rank) == min(position, len(ranks) + 1) - 1
+
+
+@pytest.mark.parametrize("position", [1, 3, 5])
+async def test_rank_for_position_ignores_the_moving_task(db, user, position):
+    column = await _column_with_tasks(db, user, 5)
+    moving = column.tasks[2]
+    others = await _ordered_ranks(db, column.id, exclude_task_id=moving.id)
+
+    rank = await TaskRankService(db).rank_for_position(column.id, position, exclude_task_id=moving.id)
+
+    assert sorted(others + [rank]).index(rank) == position - 1
+
+
+async def test_rank_for_position_in_an_empty_column(db, user):
+    column = await _column_with_tasks(db, user, 0)
+    assert await TaskRankService(db).rank_for_position(column.id, 3)
+
+
+async def test_rebalance_invalidates_the_board_snapshot(db, user):
+    # Keys grown long by repeated inserts at one spot
+    column = BoardColumn(name="Todo", tasks=[
+        Task(title=f"Task {i}", rank=rank) for i, rank in enumerate(["V", "Vzz", "Vzzz", "Vzzzz", "W"])
+    ])
+    db.add(Board(name="Board", user_id=user.id, columns=[column]))
+    await db.commit()
+    column_id, board_id = column.id, column.board_id
+    before = await ColumnService(db).get_board_version(board_id, user)
+    cached = (await ColumnService(db).get_columns(board_id, user, tasks_per_column=2))["data"]
+
+    await TaskRankService(db).rebalance_column(column_id)
+    await db.commit()
+    db.expire_all()  # as a new request's session would see it
+
+    assert await ColumnService(db).get_board_version(board_id, user) == before + 1
+    fresh = (await ColumnService(db).get_columns(board_id, user, tasks_per_column=2))["data"]
+    assert fresh[0]["tasks"] == cached[0]["tasks"]
+    # The cursor names a task, not its old rank
+    assert fresh[0]["next_cursor"] == cached[0]["next_cursor"]
+
+
+async def test_paging_continues_across_a_rebalance(db, user):
+    column = BoardColumn(name="Todo", tasks=[
+        Task(title=f"Task {i}", rank=rank) for i, rank in enumerate(["V", "Vzz", "Vzzz", "Vzzzz", "W"])
+    ])
+    db.add(Board(name="Board", user_id=user.id, columns=[column]))
+    await db.commit()
+    column_id, ids = column.id, [task.id for task in column.tasks]
+
+    first = (await TaskService(db).get_tasks(column_id, user, limit=2))["data"]
+    await TaskRankService(db).rebalance_column(column_id)
+    await db.commit()
+    rest = (await TaskService(db).get_tasks(column_id, user, limit=10, cursor=first["next_cursor"]))["data"]
+
+    assert [task["id"] for task in first["tasks"] + rest["tasks"]] == ids
+    assert [task["position"] for task in rest["tasks"]] == [3, 4, 5]
+
+
+async def test_a_cursor_whose_task_left_the_column_is_a_conflict(db, user):
+    column = await _column_with_tasks(db, user, 3)
+    column_id, last_id = column.id, column.tasks[1].id
+    first = (await TaskService(db).get_tasks(column_id, user, limit=2))["data"]
+
+    await db.execute(delete(Task).where(Task.id == last_id))
+    await db.commit()
+
+    with pytest.raises(AppException) as error:
+        await TaskService(db).get_tasks(column_id, user, cursor=first["next_cursor"])
+    assert error.value.status_code == 409
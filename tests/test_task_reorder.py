@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import select
+
+from app.models.audit import AuditLog
+from app.models.tasks import Board, BoardColumn, Task
+from app.schema.task_schema import TaskPlacement, TaskReorder
+from app.services.task_servie import TaskService
+from app.utils.lexorank import evenly_spaced_ranks
+
+pytestmark = pytest.mark.anyio
+
+
+async def _board(db, user, tasks_per_column: int) -> Board:
+    board = Board(name="Board", user_id=user.id)
+    for name in ("Todo", "Done"):
+        column = BoardColumn(name=name)
+        column.tasks = [
+            Task(title=f"{name} {i}", rank=rank)
+            for i, rank in enumerate(evenly_spaced_ranks(tasks_per_column))
+        ]
+        board.columns.append(column)
+    db.add(board)
+    await db.commit()
+    return board
+
+
+async def test_bulk_reorder_is_audited(db, user):
+    board = await _board(db, user, 3)
+    todo, done = board.columns
+    moved = todo.tasks[0]
+
+    await TaskService(db).reorder_tasks(TaskReorder(moves=[
+        TaskPlacement(task_id=moved.id, column_id=done.id, after_id=done.tasks[0].id),
+    ]), user)
+
+    records = (await db.execute(
+        select(AuditLog).where(AuditLog.table_name == "tasks", AuditLog.action == "UPDATE")
+    )).scalars().all()
+    by_task = {record.record_id: record for record in records}
+    assert moved.id in by_task
+    record = by_task[moved.id]
+    assert record.changed_data["column_id"] == {"old": todo.id, "new": done.id}
+    assert record.board_id == board.id
+    assert record.task_id == moved.id
+
+
+async def test_reorder_rewrites_only_the_moved_tasks(db, user):
+    board = await _board(db, user, 5)
+    todo, done = board.columns
+    done_id, done_ids = done.id, [task.id for task in done.tasks]
+    before = {task.id: task.rank for column in board.columns for task in column.tasks}
+    first, second, third = todo.tasks[0].id, todo.tasks[4].id, done_ids[1]
+
+    # Drag two Todo tasks around a Done task; the second move is placed
+    # relative to the first one's new position
+    response = await TaskService(db).reorder_tasks(TaskReorder(moves=[
+        TaskPlacement(task_id=first, column_id=done_id, before_id=third),
+        TaskPlacement(task_id=second, column_id=done_id, before_id=first),
+    ]), user)
+    assert response["data"]["tasks"] == [
+        {"id": first, "column_id": done_id}, {"id": second, "column_id": done_id},
+    ]
+
+    db.expire_all()
+    rows = (await db.execute(
+        select(Task.id, Task.column_id, Task.rank).order_by(Task.rank, Task.id)
+    )).all()
+    changed = {row.id for row in rows if before[row.id] != row.rank}
+    assert changed == {first, second}
+    assert [row.id for row in rows if row.column_id == done_id] == [
+        done_ids[0], third, first, second, *done_ids[2:],
+    ]
@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import select
+
+from app.core.response import AppException
+from app.models.tasks import Board, BoardColumn, Task
+from app.schema.task_schema import TaskMove, TaskPlacement, TaskReorder, TaskUpdate
+from app.services.task_servie import TaskService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def columns(db, user):
+    """'Write docs' in Todo, 'write-docs' (same normalized title) and 'Ship' in Done."""
+    todo = BoardColumn(name="Todo", tasks=[Task(title="Write docs", rank="V")])
+    done = BoardColumn(name="Done", tasks=[Task(title="write-docs", rank="V"), Task(title="Ship", rank="W")])
+    later = BoardColumn(name="Later")
+    db.add(Board(name="Board", user_id=user.id, columns=[todo, done, later]))
+    await db.commit()
+    # Plain ids: a rejected request rolls back and expires the loaded objects
+    return {
+        "todo": todo.id, "done": done.id, "later": later.id,
+        "docs": todo.tasks[0].id, "done_docs": done.tasks[0].id, "ship": done.tasks[1].id,
+    }
+
+
+async def _column_of(db, task_id: int) -> int:
+    db.expire_all()
+    return await db.scalar(select(Task.column_id).where(Task.id == task_id))
+
+
+async def test_move_into_a_column_with_the_same_title_is_a_conflict(db, user, columns):
+    with pytest.raises(AppException) as error:
+        await TaskService(db).move_task(TaskMove(
+            task_id=columns["docs"], source_column_id=columns["todo"],
+            destination_column_id=columns["done"], destination_position=1,
+        ), user)
+    assert error.value.status_code == 409
+    assert await _column_of(db, columns["docs"]) == columns["todo"]
+
+
+async def test_reorder_into_a_column_with_the_same_title_is_a_conflict(db, user, columns):
+    with pytest.raises(AppException) as error:
+        await TaskService(db).reorder_tasks(TaskReorder(moves=[
+            TaskPlacement(task_id=columns["docs"], column_id=columns["done"], after_id=columns["done_docs"]),
+        ]), user)
+    assert error.value.status_code == 409
+    assert await _column_of(db, columns["docs"]) == columns["todo"]
+
+
+async def test_update_checks_the_title_in_the_destination_column(db, user, columns):
+    service = TaskService(db)
+
+    # Moving alone, or renaming to a title that is only taken in the destination
+    for payload in (
+        TaskUpdate(column_id=columns["done"]),
+        TaskUpdate(title="Ship", column_id=columns["done"]),
+    ):
+        with pytest.raises(AppException) as error:
+            await service.update_task(columns["docs"], payload, user)
+        assert error.value.status_code == 409
+        assert await _column_of(db, columns["docs"]) == columns["todo"]
+
+    # A title that is only taken in the column being left is fine
+    await service.update_task(columns["ship"], TaskUpdate(title="Write-Docs", column_id=columns["later"]), user)
+    assert await _column_of(db, columns["ship"]) == columns["later"]
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.models.password import PasswordOTP
+from app.models.users import AuthUser
+from app.services.password_service import PasswordService
+from app.utils.identity_cache import identity_cache
+from app.utils.jwt import AuthError, authenticate_token, create_jwt
+
+pytestmark = pytest.mark.anyio
+
+
+def _token(user, version: int) -> str:
+    token, _ = create_jwt({"sub": str(user.id), "email": user.email, "ver": version})
+    return token
+
+
+async def test_password_reset_revokes_issued_tokens(db, user):
+    identity_cache.invalidate(user.id)
+    old_token = _token(user, 0)
+    principal, _ = await authenticate_token(db, old_token)
+    assert principal.token_version == 0
+
+    db.add(PasswordOTP(
+        email=user.email, otp=123456, is_verified=True,
+        expires_at=datetime.utcnow() + timedelta(minutes=5),
+    ))
+    await db.commit()
+    await PasswordService(db).reset_password(user.email, "N3w-Passw0rd!", "N3w-Passw0rd!")
+
+    with pytest.raises(AuthError):
+        await authenticate_token(db, old_token)
+
+    principal, _ = await authenticate_token(db, _token(user, 1))
+    assert principal.token_version == 1
+
+
+async def test_newer_token_refreshes_a_stale_cache_entry(db, user):
+    identity_cache.invalidate(user.id)
+    await authenticate_token(db, _token(user, 0))
+
+    # Another worker reset the password: the database moved on, this cache did not
+    await db.execute(update(AuthUser).where(AuthUser.id == user.id).values(token_version=1))
+    await db.commit()
+
+    principal, _ = await authenticate_token(db, _token(user, 1))
+    assert principal.token_version == 1